@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class QostConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'qost'
+
+    def ready(self):
+        import qost.signals  # noqa: F401
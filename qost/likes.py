@@ -0,0 +1,208 @@
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from qost.models import Like, Post
+from qost.trending import like_bucket, like_deltas_expression
+from root.caches import is_shared
+
+# Layklar soni Post.like ga darhol yozilmaydi: o'zgarish cache'dagi hisoblagichga
+# atomik incr bilan qo'shiladi va `manage.py flush_likes` ularni bitta UPDATE bilan
+# bazaga o'tkazadi. flush_likes bitta nusxada ishlashi kerak va buning uchun barcha
+# jarayonlarga umumiy cache (Redis, Memcached) shart; LocMem da layk darhol yoziladi.
+DELTA_KEY = 'like-delta:{}'
+# Trending uchun: post va layk created_at bo'lagi (qost.trending.LIKE_BUCKET) bo'yicha
+BUCKET_DELTA_KEY = 'like-bucket-delta:{}:{}'
+DIRTY_FLAG_KEY = 'like-dirty:{}:{}'
+DIRTY_SLOT_KEY = 'like-dirty-slot:{}'
+DIRTY_SEQ_KEY = 'like-dirty-seq'
+FLUSHED_SEQ_KEY = 'like-flushed-seq'
+GAP_KEY = 'like-dirty-gap'
+# flush va rescore_trending bir vaqtda ishlamasligi uchun
+FLUSH_LOCK_KEY = 'like-flush-lock'
+FLUSH_LOCK_TIMEOUT = 600
+# Navbat belgisi shuncha vaqtda o'chadi: yo'qolgan slot posti keyingi laykda qayta navbatga tushadi
+DIRTY_TIMEOUT = 300
+# Bo'lak hisoblagichlari ko'payib ketmasligi uchun; flush_likes bundan uzoq to'xtasa
+# trending farqini `manage.py rescore_trending` tuzatadi (Post.like hisobiga ta'sir qilmaydi)
+BUCKET_TIMEOUT = 24 * 60 * 60
+# seq olingan, lekin slot yozilmagan (jarayon o'rtada to'xtagan) bo'lsa, shuncha kutib o'tib ketiladi
+GAP_TIMEOUT = 60
+
+
+def buffered():
+    enabled = getattr(settings, 'QOST_LIKE_BUFFER', None)
+    return is_shared() if enabled is None else enabled
+
+
+def incr(key, delta, timeout=None):
+    cache.add(key, 0, timeout)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.set(key, delta, timeout)
+
+
+def add_delta(post_id, delta, moment):
+    bucket = like_bucket(moment)
+    incr(BUCKET_DELTA_KEY.format(post_id, bucket), delta, BUCKET_TIMEOUT)
+    incr(DELTA_KEY.format(post_id), delta)
+
+    # (post, bo'lak) faqat birinchi o'zgarishda navbatga qo'yiladi
+    if cache.add(DIRTY_FLAG_KEY.format(post_id, bucket), 1, DIRTY_TIMEOUT):
+        cache.add(DIRTY_SEQ_KEY, 0, None)
+        seq = cache.incr(DIRTY_SEQ_KEY)
+        cache.set(DIRTY_SLOT_KEY.format(seq), (post_id, bucket), None)
+
+
+def pending_delta(post_id):
+    return cache.get(DELTA_KEY.format(post_id)) or 0
+
+
+def apply(post, delta, moment):
+    if buffered():
+        add_delta(post.id, delta, moment)
+        return
+    Post.objects.filter(id=post.id).update(
+        like=F('like') + delta,
+        trending_score=like_deltas_expression({post.id: {like_bucket(moment): delta}})
+    )
+    post.like += delta
+
+
+def like(user, post):
+    try:
+        with transaction.atomic():
+            instance = Like.objects.create(like_user=user, like_post=post)
+    except IntegrityError:
+        return False
+    apply(post, 1, instance.created_at)
+    return True
+
+
+def unlike(user, post):
+    # Trending dan layk qo'shilgan vaqti bo'yicha ayiriladi
+    created_at = Like.objects.filter(like_user=user, like_post=post).values_list('created_at', flat=True).first()
+    if created_at is None:
+        return False
+    deleted, _ = Like.objects.filter(like_user=user, like_post=post).delete()
+    if deleted:
+        apply(post, -1, created_at)
+    return bool(deleted)
+
+
+def gap_expired(seq):
+    now = time.time()
+    gap = cache.get(GAP_KEY)
+    if gap is None or gap[0] != seq:
+        cache.set(GAP_KEY, (seq, now), None)
+        return False
+    return now - gap[1] > GAP_TIMEOUT
+
+
+def collect():
+    flushed = cache.get(FLUSHED_SEQ_KEY, 0)
+    current = cache.get(DIRTY_SEQ_KEY, 0)
+    if current <= flushed:
+        return {}, {}, lambda: None
+
+    slots = cache.get_many([DIRTY_SLOT_KEY.format(seq) for seq in range(flushed + 1, current + 1)])
+    # add_delta seq ni oshirgan, lekin slotni hali yozmagan bo'lishi mumkin: bunday slotdan
+    # o'tib ketilmaydi, u va undan keyingilar keyingi flushda o'qiladi
+    entries, slot_keys = set(), []
+    for seq in range(flushed + 1, current + 1):
+        key = DIRTY_SLOT_KEY.format(seq)
+        if key in slots:
+            entries.add(tuple(slots[key]))
+        elif not gap_expired(seq):
+            break
+        slot_keys.append(key)
+        flushed = seq
+
+    # Belgi avval o'chiriladi: shundan keyingi layklar postni qayta navbatga qo'yadi
+    cache.delete_many([DIRTY_FLAG_KEY.format(post_id, bucket) for post_id, bucket in entries])
+    keys = {BUCKET_DELTA_KEY.format(post_id, bucket): (post_id, bucket) for post_id, bucket in entries}
+    keys.update({DELTA_KEY.format(post_id): (post_id, None) for post_id, _ in entries})
+    taken = {key: value for key, value in cache.get_many(keys).items() if value}
+    counts, deltas = {}, {}
+    for key, delta in taken.items():
+        post_id, bucket = keys[key]
+        if bucket is None:
+            counts[post_id] = delta
+        else:
+            deltas.setdefault(post_id, {})[bucket] = delta
+
+    def consume():
+        # decr faqat o'qilgan qiymatni ayiradi, oraliqda kelgan layklar saqlanib qoladi
+        for key, delta in taken.items():
+            cache.decr(key, delta)
+        cache.delete_many(slot_keys)
+        cache.set(FLUSHED_SEQ_KEY, flushed, None)
+    return counts, deltas, consume
+
+
+@contextmanager
+def flush_lock(wait=False):
+    # wait=False: band bo'lsa False qaytadi (flush shu aylanishni o'tkazib yuboradi)
+    while not cache.add(FLUSH_LOCK_KEY, 1, FLUSH_LOCK_TIMEOUT):
+        if not wait:
+            yield False
+            return
+        time.sleep(0.1)
+    try:
+        yield True
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def extend_flush_lock():
+    cache.touch(FLUSH_LOCK_KEY, FLUSH_LOCK_TIMEOUT)
+
+
+def pending_deltas(post_ids):
+    # Navbatdagi, hali flush qilinmagan bo'lak o'zgarishlari: {post_id: {bucket: delta}}.
+    # collect hisoblagichlarni faqat commit dan keyin ayiradi, shuning uchun kutilayotgan
+    # har bir (post, bo'lak) FLUSHED_SEQ dan keyingi slotlarda turadi
+    flushed = cache.get(FLUSHED_SEQ_KEY, 0)
+    current = cache.get(DIRTY_SEQ_KEY, 0)
+    if current <= flushed:
+        return {}
+    post_ids = set(post_ids)
+    slots = cache.get_many([DIRTY_SLOT_KEY.format(seq) for seq in range(flushed + 1, current + 1)])
+    keys = {
+        BUCKET_DELTA_KEY.format(post_id, bucket): (post_id, bucket)
+        for post_id, bucket in slots.values() if post_id in post_ids
+    }
+    deltas = {}
+    for key, delta in cache.get_many(keys).items():
+        if delta:
+            post_id, bucket = keys[key]
+            deltas.setdefault(post_id, {})[bucket] = delta
+    return deltas
+
+
+def flush():
+    with flush_lock() as locked:
+        return flush_locked() if locked else 0
+
+
+def flush_locked():
+    counts, deltas, consume = collect()
+    with transaction.atomic():
+        if counts or deltas:
+            Post.objects.filter(id__in={*counts, *deltas}).update(
+                like=F('like') + Case(
+                    *[When(id=post_id, then=Value(delta)) for post_id, delta in counts.items()],
+                    default=Value(0),
+                    output_field=IntegerField()
+                ),
+                trending_score=like_deltas_expression(deltas)
+            )
+        # Hisoblagichlar UPDATE commit bo'lgandan keyingina ayiriladi: xatoda (masalan
+        # "database is locked") layklar cache'da qoladi va keyingi flush ularni qayta o'qiydi
+        transaction.on_commit(consume)
+    return len({*counts, *deltas})
@@ -0,0 +1,100 @@
+import random
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from django.db.models import Count
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from qost.models import Comment, Post
+from qost.pagination import KeysetPagination
+from qost.views import CommentListView
+from root.bench import BenchCommand, count_queries, latency_stats
+from users.models import User
+
+
+class Command(BenchCommand):
+    help = (
+        "Izohlar: feed sahifasi Count() annotatsiyasi bilan va comment_count ustuni bilan, "
+        "izohlar ro'yxatining birinchi va chuqur sahifalari (keyset va OFFSET) hamda izoh yozish"
+    )
+    iterations = 50
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=200000)
+        parser.add_argument('--hot-comments', type=int, default=50000, help='Bitta ommabop postdagi izohlar')
+
+    def measure(self, options):
+        user = User.objects.create(username='benchcomments', email='bench-comments@example.com')
+        hot = self.populate(user, options['posts'], options['comments'], options['hot_comments'])
+
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse('comments', args=[hot.id])
+        deep = options['hot_comments'] - 20
+        cursor = self.cursor_at(client, url, deep)
+        paginator = KeysetPagination()
+        paginator.ordering = CommentListView.keyset_ordering
+        paginator.fields = [Comment._meta.get_field(name) for name in paginator.ordering]
+        comments = Comment.objects.filter(comment_post=hot).select_related('comment_user').order_by(*paginator.ordering)
+        values = comments.values_list(*paginator.ordering)[deep - 1]
+        scenarios = {
+            'feed page: Count()': lambda: list(self.feed().annotate(total=Count('comment_post'))[:20]),
+            'feed page: comment_count': lambda: list(self.feed()[:20]),
+            'GET feed/': lambda: client.get(reverse('feed')),
+            'GET comments/ first page': lambda: client.get(url),
+            f'GET comments/ row {deep}': lambda: client.get(url, {'cursor': cursor}),
+            f'query row {deep}: keyset': lambda: list(comments.filter(paginator.after(values))[:20]),
+            f'query row {deep}: OFFSET': lambda: list(comments[deep:deep + 20]),
+            'POST comment': lambda: client.post(url, {'text': 'bench'}, format='json'),
+        }
+        results = {'data': {'posts': options['posts'], 'comments': Comment.objects.count()}}
+        for name, load in scenarios.items():
+            results[name] = self.run(load, options['iterations'])
+        return results
+
+    @staticmethod
+    def feed():
+        return Post.objects.select_related('post_user').order_by('-created_at', '-id')
+
+    @staticmethod
+    def populate(user, posts, comments, hot_comments):
+        # Comment.save har izohda Post ni yangilaydi; bench uchun bulk_create va tayyor comment_count
+        rng = random.Random(0)
+        created = Post.objects.bulk_create(
+            (Post(post_user=user, title='bench', content='bench') for _ in range(posts)), batch_size=5000
+        )
+        hot = created[0]
+        targets = [hot.id] * hot_comments + [rng.choice(created).id for _ in range(comments - hot_comments)]
+        Comment.objects.bulk_create(
+            (Comment(comment_user=user, comment_post_id=post_id, text='bench') for post_id in targets),
+            batch_size=5000
+        )
+        counts = Comment.objects.values('comment_post').annotate(total=Count('id')).values_list('comment_post', 'total')
+        Post.objects.bulk_update(
+            [Post(id=post_id, comment_count=total) for post_id, total in counts], ['comment_count'], batch_size=5000
+        )
+        return hot
+
+    @staticmethod
+    def cursor_at(client, url, row):
+        # Chuqur sahifa kursorini olish uchun ro'yxat boshidan max_page_size bilan yuriladi
+        cursor, seen = None, 0
+        while seen < row:
+            size = min(100, row - seen)
+            params = {'page_size': size, **({'cursor': cursor} if cursor else {})}
+            cursor = parse_qs(urlsplit(client.get(url, params).json()['next']).query)['cursor'][0]
+            seen += size
+        return cursor
+
+    @staticmethod
+    def run(load, iterations):
+        latencies = []
+        with count_queries() as queries:
+            for _ in range(iterations):
+                started = time.perf_counter()
+                load()
+                latencies.append((time.perf_counter() - started) * 1000)
+        return {**latency_stats(latencies), 'queries': round(len(queries) / iterations, 1)}
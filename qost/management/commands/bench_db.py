@@ -0,0 +1,118 @@
+import random
+import sqlite3
+from contextlib import contextmanager
+from unittest import mock
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connection, connections
+from django.db.models import F
+
+from qost.models import Post
+from root import routers
+from root.bench import BenchCommand, latency_stats, run_threads
+from users.models import User
+
+# Sozlanmagan profil: Django sqlite3 standartlari (rollback jurnali, synchronous=FULL, har so'rovga ulanish)
+DEFAULT_PROFILE = {
+    'CONN_MAX_AGE': 0,
+    'OPTIONS': {'init_command': 'PRAGMA journal_mode=DELETE; PRAGMA synchronous=FULL'},
+}
+
+
+class Command(BenchCommand):
+    help = (
+        "O'qish/yozish aralashmasi (feed sahifasi / like UPDATE) bir nechta thread'da: sozlanmagan sqlite, "
+        "settings dagi WAL profili va replica router bilan (replica - primary ning fayl nusxasi)"
+    )
+    iterations = 500
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--write-ratio', type=float, default=0.1)
+        parser.add_argument('--posts', type=int, default=10000)
+
+    def measure(self, options):
+        user = User.objects.create(username='benchdb', email='bench-db@example.com')
+        Post.objects.bulk_create(
+            (Post(post_user=user, title='bench', content='bench') for _ in range(options['posts'])), batch_size=5000
+        )
+        post_ids = list(Post.objects.values_list('id', flat=True))
+        tuned = {key: connection.settings_dict[key] for key in ('CONN_MAX_AGE', 'OPTIONS')}
+
+        results = {}
+        with self.profile(DEFAULT_PROFILE):
+            results['default sqlite'] = self.run(post_ids, options, replica=False)
+        with self.profile(tuned):
+            results['WAL profile'] = self.run(post_ids, options, replica=False)
+            with self.replica(tuned):
+                results['WAL profile + replica'] = self.run(post_ids, options, replica=True)
+        return results
+
+    @staticmethod
+    @contextmanager
+    def profile(profile):
+        # Thread'lardagi yangi ulanishlar ham shu settings_dict dan quriladi
+        saved = {key: connection.settings_dict[key] for key in profile}
+        connection.close()
+        connection.settings_dict.update(profile)
+        try:
+            yield
+        finally:
+            connection.close()
+            connection.settings_dict.update(saved)
+
+    @staticmethod
+    @contextmanager
+    def replica(profile):
+        path = f"{connection.settings_dict['NAME']}.replica"
+        with sqlite3.connect(connection.settings_dict['NAME']) as source, sqlite3.connect(path) as target:
+            source.backup(target)
+        replica = {
+            **connection.settings_dict,
+            'NAME': f'file:{path}?mode=ro',
+            'CONN_MAX_AGE': profile['CONN_MAX_AGE'],
+            'OPTIONS': {'uri': True, 'init_command': settings.SQLITE_PRAGMAS},
+        }
+        connections.settings['replica'] = replica
+        try:
+            with mock.patch.object(routers, 'replica_aliases', lambda: ['replica']):
+                yield
+        finally:
+            connections['replica'].close()
+            del connections.settings['replica']
+
+    @staticmethod
+    def run(post_ids, options, replica):
+        rng = random.Random(0)
+        write_ratio = options['write_ratio']
+
+        def request(worker, iteration):
+            # Middleware kabi: har "so'rov" boshida routing holati, oxirida close_old_connections
+            routers.replica_reads.set(replica)
+            routers.pinned.set(False)
+            kind = 'write' if rng.random() < write_ratio else 'read'
+            try:
+                if kind == 'write':
+                    Post.objects.filter(id=rng.choice(post_ids)).update(like=F('like') + 1)
+                else:
+                    posts = list(Post.objects.select_related('post_user').order_by('-id')[:20])
+                    if posts[0]._state.db != ('replica' if replica else 'default'):
+                        raise RuntimeError(f'read routed to {posts[0]._state.db}')
+                return kind, True
+            except OperationalError:
+                return kind, False
+            finally:
+                close_old_connections()
+
+        samples, elapsed = run_threads(options['threads'], options['iterations'], request)
+        reads = [ms for (kind, ok), ms in samples if kind == 'read' and ok]
+        writes = [ms for (kind, ok), ms in samples if kind == 'write' and ok]
+        return {
+            'ops_per_s': round(len(samples) / elapsed, 1),
+            'read_p50_ms': latency_stats(reads)['p50_ms'],
+            'read_p99_ms': latency_stats(reads)['p99_ms'],
+            'write_p50_ms': latency_stats(writes)['p50_ms'],
+            'write_p99_ms': latency_stats(writes)['p99_ms'],
+            'locked': sum(1 for (_, ok), _ in samples if not ok),
+        }
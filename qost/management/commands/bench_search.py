@@ -0,0 +1,93 @@
+import itertools
+import random
+import string
+
+from django.db.models import Q
+
+from qost.models import Post
+from qost.search import get_search_backend
+from root.bench import BenchCommand, latency_stats, timed
+from users.models import User
+
+
+class Command(BenchCommand):
+    help = (
+        "Sintetik korpusda (standart 1M post) qidiruv: indeksni qayta qurish, bitta postni indekslash "
+        "va bm25 so'rovlari kechikishi, icontains to'liq skan bilan taqqoslab"
+    )
+    iterations = 50
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--rows', type=int, default=1000000)
+        parser.add_argument('--vocabulary', type=int, default=20000)
+        parser.add_argument('--scan-iterations', type=int, default=3, help='icontains uchun (sekin)')
+
+    def measure(self, options):
+        rng = random.Random(0)
+        words = self.vocabulary(rng, options['vocabulary'])
+        # Zipf: so'z chastotasi 1/rank
+        weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+        user = User.objects.create(username='benchsearch', email='bench-search@example.com')
+
+        _, populate_ms = timed(self.populate, rng, user, words, weights, options['rows'])
+        backend = get_search_backend()
+        _, rebuild_ms = timed(backend.rebuild)
+        results = {
+            'corpus': {'rows': options['rows'], 'insert_s': round(populate_ms / 1000, 1)},
+            'rebuild_search_index': {
+                'seconds': round(rebuild_ms / 1000, 1),
+                'rows_per_s': round(options['rows'] / rebuild_ms * 1000)
+            },
+        }
+
+        latencies = [
+            timed(Post.objects.create, post_user=user, **self.document(rng, words, weights))[1]
+            for _ in range(options['iterations'])
+        ]
+        results['create post + index'] = latency_stats(latencies)
+
+        common, middle, rare = words[0], words[len(words) // 50], words[-1]
+        queries = {
+            f'common "{common}"': common,
+            f'mid "{middle}"': middle,
+            f'rare "{rare}"': rare,
+            'two words': f'{common} {middle}',
+            f'prefix "{middle[:3]}"': middle[:3],
+        }
+        for name, query in queries.items():
+            latencies = [timed(backend.search, query, 20)[1] for _ in range(options['iterations'])]
+            results[f'bm25 {name}'] = latency_stats(latencies)
+        latencies = [timed(backend.search, middle, 20, 1000)[1] for _ in range(options['iterations'])]
+        results['bm25 mid offset=1000'] = latency_stats(latencies)
+
+        # Kam uchraydigan so'zda LIMIT erta to'xtamaydi: butun jadval skan qilinadi
+        for name, word in (('mid', middle), ('rare', rare)):
+            scan = Post.objects.filter(Q(title__icontains=word) | Q(content__icontains=word)).order_by('-id')
+            latencies = [
+                timed(list, scan.values_list('id', flat=True)[:20])[1] for _ in range(options['scan_iterations'])
+            ]
+            results[f'icontains {name}'] = latency_stats(latencies)
+        return results
+
+    @staticmethod
+    def document(rng, words, weights):
+        return {
+            'title': ' '.join(rng.choices(words, cum_weights=weights, k=3))[:35],
+            'content': ' '.join(rng.choices(words, cum_weights=weights, k=30)),
+        }
+
+    @staticmethod
+    def vocabulary(rng, size):
+        words = set()
+        while len(words) < size:
+            words.add(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))))
+        return sorted(words, key=lambda word: rng.random())
+
+    def populate(self, rng, user, words, weights, rows, batch_size=20000):
+        # bulk_create signal'larsiz: indeks keyin bitta rebuild bilan quriladi
+        for start in range(0, rows, batch_size):
+            Post.objects.bulk_create([
+                Post(post_user=user, **self.document(rng, words, weights))
+                for _ in range(min(batch_size, rows - start))
+            ])
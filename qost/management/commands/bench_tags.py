@@ -0,0 +1,80 @@
+import time
+
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from qost.models import Post, Xtext
+from qost.tags import attach_tags, extract_tags
+from root.bench import BenchCommand, count_queries, latency_stats, timed
+from users.models import User
+
+
+@transaction.atomic
+def attach_one_by_one(post):
+    # Taqqoslash uchun: har bir teg uchun get_or_create va add
+    for tag in extract_tags(post.title, post.content):
+        xtext, _ = Xtext.objects.get_or_create(text=tag)
+        post.post_xtext.add(xtext)
+
+
+class Command(BenchCommand):
+    help = (
+        "Postga teg biriktirish narxi teglar soniga qarab (attach_tags va har teg uchun get_or_create), "
+        "hamda teg bo'yicha postlar ro'yxati keyset sahifasi"
+    )
+    iterations = 200
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--tags', default='1,5,10,30', help='Post boshiga teglar soni, vergul bilan')
+        parser.add_argument('--tag-posts', type=int, default=20000, help="Ro'yxat uchun bitta tegdagi postlar")
+
+    def measure(self, options):
+        user = User.objects.create(username='benchtags', email='bench-tags@example.com')
+        results = {}
+        for count in [int(value) for value in options['tags'].split(',')]:
+            for name, attach in (('attach_tags', attach_tags), ('get_or_create', attach_one_by_one)):
+                latencies, queries = [], []
+                for index in range(options['iterations']):
+                    # Teglarning yarmi yangi, yarmi avvaldan bor
+                    tags = [f'#{name}new{index}x{tag}' for tag in range(count // 2)]
+                    tags += [f'#common{tag}' for tag in range(count - len(tags))]
+                    post = Post.objects.create(post_user=user, title='bench', content=' '.join(tags))
+                    with count_queries() as executed:
+                        started = time.perf_counter()
+                        attach(post)
+                        latencies.append((time.perf_counter() - started) * 1000)
+                    queries.append(len(executed))
+                results[f'{count} tags {name}'] = {**latency_stats(latencies), 'queries': max(queries)}
+        results.update(self.listing(user, options))
+        return results
+
+    @staticmethod
+    def listing(user, options):
+        tag = Xtext.objects.create(text='benchlist')
+        posts = Post.objects.bulk_create(
+            (Post(post_user=user, title='bench', content='#benchlist') for _ in range(options['tag_posts'])),
+            batch_size=5000
+        )
+        through = Post.post_xtext.through
+        through.objects.bulk_create([through(post_id=post.id, xtext_id=tag.id) for post in posts], batch_size=5000)
+
+        client = APIClient()
+        client.force_authenticate(user)
+        first = reverse('tag-posts', args=['benchlist'])
+        # Keyset: keyingi sahifa ham birinchisi kabi indeksdan o'qiladi
+        pages = {'first page': first, 'next page': client.get(first).json()['next']}
+        results = {}
+        for name, url in pages.items():
+            latencies = []
+            with count_queries() as queries:
+                for _ in range(options['iterations']):
+                    response, ms = timed(client.get, url)
+                    latencies.append(ms)
+            if response.status_code != 200:
+                raise RuntimeError(f'tag-posts: {response.status_code}')
+            results[f"tags/ {name} ({options['tag_posts']} posts)"] = {
+                **latency_stats(latencies), 'queries': round(len(queries) / options['iterations'], 1)
+            }
+        return results
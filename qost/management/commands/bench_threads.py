@@ -0,0 +1,91 @@
+import random
+import time
+
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from qost import threads
+from qost.models import Comment, Post
+from root.bench import BenchCommand, count_queries, latency_stats
+from users.models import User
+
+
+def level_by_level(root, depth=None):
+    # Taqqoslash uchun materialized path siz yo'l: har bir daraja uchun parent_id__in so'rovi
+    rows, level, current = [], [root.id], 0
+    while level and (depth is None or current < depth):
+        children = list(Comment.objects.filter(parent_id__in=level).values_list(
+            'id', 'comment_user__username', 'parent_id', 'depth', 'text', 'created_at'
+        ))
+        rows.extend(dict(zip(threads.FIELDS, row)) for row in children)
+        level = [row[0] for row in children]
+        current += 1
+    return rows
+
+
+class Command(BenchCommand):
+    help = (
+        "Bitta ildiz ostida o'n minglab javobli thread: materialized path bilan bitta diapazon so'rovi "
+        "+ build_tree va daraja-daraja parent_id so'rovlari bilan taqqoslash"
+    )
+    iterations = 20
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--replies', type=int, default=20000)
+        parser.add_argument('--depth', type=int, default=3, help='Cheklangan qism uchun chuqurlik')
+
+    def measure(self, options):
+        user = User.objects.create(username='benchthreads', email='bench-threads@example.com')
+        post = Post.objects.create(post_user=user, title='bench', content='bench')
+        root = Comment.objects.create(comment_user=user, comment_post=post, text='root')
+        self.populate(root, options['replies'])
+
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse('comment-thread', args=[root.id])
+        scenarios = {
+            'path: query': lambda: threads.subtree(root),
+            'path: query + tree': lambda: threads.build_tree(threads.subtree(root)),
+            f"path: depth<={options['depth']}": lambda: threads.build_tree(threads.subtree(root, options['depth'])),
+            'level-by-level + tree': lambda: threads.build_tree(level_by_level(root)),
+            f"level-by-level depth<={options['depth']}": lambda: level_by_level(root, options['depth']),
+            'GET thread/': lambda: client.get(url),
+            f"GET thread/?depth={options['depth']}": lambda: client.get(url, {'depth': options['depth']}),
+        }
+        results = {'thread': {'replies': options['replies'], 'max_depth': max(
+            Comment.objects.filter(comment_post=post).values_list('depth', flat=True)
+        )}}
+        for name, load in scenarios.items():
+            results[name] = self.run(load, options['iterations'])
+        return results
+
+    @staticmethod
+    def populate(root, count):
+        # Comment.save har bir javob uchun 3 ta so'rov qiladi; id va path oldindan hisoblanib bulk_create
+        rng = random.Random(0)
+        next_id = root.id + 1
+        nodes = [(root.id, root.path, root.depth)]
+        replies = []
+        for _ in range(count):
+            parent_id, parent_path, parent_depth = rng.choice(nodes)
+            if parent_depth + 1 >= threads.MAX_DEPTH:
+                parent_id, parent_path, parent_depth = nodes[0]
+            path = threads.child_path(parent_path, next_id)
+            replies.append(Comment(
+                id=next_id, comment_user_id=root.comment_user_id, comment_post_id=root.comment_post_id,
+                parent_id=parent_id, path=path, depth=parent_depth + 1, text=f'reply {next_id}'
+            ))
+            nodes.append((next_id, path, parent_depth + 1))
+            next_id += 1
+        Comment.objects.bulk_create(replies, batch_size=5000)
+
+    @staticmethod
+    def run(load, iterations):
+        latencies = []
+        with count_queries() as queries:
+            for _ in range(iterations):
+                started = time.perf_counter()
+                load()
+                latencies.append((time.perf_counter() - started) * 1000)
+        return {**latency_stats(latencies), 'queries': round(len(queries) / iterations, 1)}
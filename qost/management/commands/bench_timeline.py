@@ -0,0 +1,102 @@
+import random
+import time
+from unittest import mock
+
+from django.core.cache import cache
+
+from qost import timeline
+from qost.models import Follow, Post
+from root.bench import BenchCommand, count_queries, latency_stats
+from users.models import User
+
+
+class Command(BenchCommand):
+    help = (
+        "Lenta strategiyalari: pure pull, to'liq fan-out-on-write va gibrid (FANOUT_LIMIT dan ko'p "
+        "obunachili mualliflar o'qishda qo'shiladi). Yozish kuchayishi va o'qish kechikishi"
+    )
+    iterations = 500
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--readers', type=int, default=2000)
+        parser.add_argument('--authors', type=int, default=200)
+        parser.add_argument('--follows', type=int, default=50, help="Har bir o'quvchi obuna bo'lgan mualliflar")
+        parser.add_argument('--posts', type=int, default=200, help="O'lchanadigan yangi postlar soni")
+        parser.add_argument('--fanout-limit', type=int, default=500, help='Gibrid uchun FANOUT_LIMIT')
+
+    def measure(self, options):
+        readers, authors = self.populate(options)
+        strategies = {
+            'pull': None,
+            'fan-out': len(readers) + 1,
+            f"hybrid limit={options['fanout_limit']}": options['fanout_limit'],
+        }
+        # Post.save dagi on_commit fan_out o'chiriladi, u write() ichida alohida sanaladi
+        fan_out = timeline.fan_out
+        results = {}
+        for name, limit in strategies.items():
+            cache.clear()
+            if limit is None:
+                with mock.patch.object(timeline, 'fan_out', lambda post: 0):
+                    write = self.write(authors, options['posts'], lambda post: 0)
+                read = self.read(readers[:options['iterations']], lambda user: timeline.pull(user, limit=20))
+            else:
+                with mock.patch.object(timeline, 'FANOUT_LIMIT', limit):
+                    for reader in readers:
+                        timeline.read(reader)
+                    with mock.patch.object(timeline, 'fan_out', lambda post: 0):
+                        write = self.write(authors, options['posts'], fan_out)
+                    read = self.read(readers[:options['iterations']], lambda user: timeline.read(user))
+            results[f'{name} write'] = write
+            results[f'{name} read'] = read
+        return results
+
+    @staticmethod
+    def populate(options):
+        rng = random.Random(0)
+        users = User.objects.bulk_create(
+            User(username=f'benchtl{index}', email=f'bench-tl-{index}@example.com')
+            for index in range(options['readers'] + options['authors'])
+        )
+        readers, authors = users[:options['readers']], users[options['readers']:]
+        # Mashhurlik Zipf ga yaqin: bir nechta muallifning obunachisi juda ko'p
+        weights = [1 / (rank + 1) for rank in range(len(authors))]
+        follows = []
+        for reader in readers:
+            following = set()
+            while len(following) < min(options['follows'], len(authors)):
+                following.add(rng.choices(authors, weights)[0].id)
+            follows.extend(Follow(follower=reader, following_id=author_id) for author_id in following)
+        Follow.objects.bulk_create(follows, batch_size=5000)
+        Post.objects.bulk_create(
+            (Post(post_user=author, title='bench', content='bench') for author in authors for _ in range(5)),
+            batch_size=5000
+        )
+        return readers, authors
+
+    @staticmethod
+    def write(authors, count, fan_out):
+        rng = random.Random(1)
+        written, latencies = 0, []
+        with count_queries() as queries:
+            for _ in range(count):
+                started = time.perf_counter()
+                post = Post.objects.create(post_user=rng.choice(authors), title='bench', content='bench')
+                written += fan_out(post)
+                latencies.append((time.perf_counter() - started) * 1000)
+        return {
+            **latency_stats(latencies),
+            'timelines_per_post': round(written / count, 1),
+            'queries': round(len(queries) / count, 1),
+        }
+
+    @staticmethod
+    def read(readers, load):
+        latencies = []
+        with count_queries() as queries:
+            for reader in readers:
+                started = time.perf_counter()
+                load(reader)
+                latencies.append((time.perf_counter() - started) * 1000)
+        return {**latency_stats(latencies), 'queries': round(len(queries) / len(readers), 1)}
@@ -0,0 +1,65 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from qost.models import PostUpload
+from qost.uploads import part_path, uploads_dir
+
+
+class Command(BaseCommand):
+    help = (
+        "Tashlab ketilgan yuklashlarni tozalaydi: max-age dan beri yozilmagan PostUpload yozuvlari "
+        "va ularning .part fayllari, hamda yozuvi yo'q eski .part fayllar"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=float, default=24.0, help='Oxirgi yozuvdan beri o\'tgan vaqt (soat)')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help='Bo\'laklar orasidagi pauza (soniya)')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(hours=options['max_age'])
+        uploads = self.clear_uploads(cutoff, options['chunk_size'], options['pause'])
+        parts = self.clear_parts(cutoff)
+        self.stdout.write(f'uploads={uploads} parts={parts}')
+
+    @staticmethod
+    def clear_uploads(cutoff, chunk_size, pause=0.0):
+        # Bo'lak yozilganda qator yangilanmaydi: faollik .part faylning mtime idan olinadi
+        stale = PostUpload.objects.filter(status=PostUpload.UPLOADING, updated_at__lt=cutoff).order_by('id')
+        total, last_id = 0, None
+        while True:
+            page = stale.filter(id__gt=last_id) if last_id else stale
+            rows = list(page[:chunk_size])
+            if not rows:
+                break
+            last_id = rows[-1].id
+            ids = []
+            for upload in rows:
+                path = part_path(upload)
+                if path.exists() and path.stat().st_mtime >= cutoff.timestamp():
+                    continue
+                path.unlink(missing_ok=True)
+                ids.append(upload.id)
+            deleted, _ = PostUpload.objects.filter(id__in=ids, status=PostUpload.UPLOADING).delete()
+            total += deleted
+            if pause:
+                time.sleep(pause)
+        return total
+
+    @staticmethod
+    def clear_parts(cutoff):
+        directory = uploads_dir()
+        if not directory.exists():
+            return 0
+        old = {
+            path.stem: path for path in directory.glob('*.part')
+            if path.stat().st_mtime < cutoff.timestamp()
+        }
+        known = {str(pk) for pk in PostUpload.objects.filter(id__in=list(old)).values_list('id', flat=True)}
+        for stem, path in old.items():
+            if stem not in known:
+                path.unlink(missing_ok=True)
+        return len(old) - len(known)
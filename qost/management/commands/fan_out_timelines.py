@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from qost.models import TimelineFanout
+from qost.timeline import fan_out
+from root.caches import is_shared
+
+
+class Command(BaseCommand):
+    help = "TimelineFanout navbatidagi yangi postlarni obunachilarning cache'dagi lentasiga yozadi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--interval', type=float, default=1.0, help='Navbat bo\'sh bo\'lganda kutish (soniya)')
+        parser.add_argument('--once', action='store_true', help='Bitta batchni ishlab chiqib ketish')
+
+    def handle(self, *args, **options):
+        if not is_shared():
+            # LocMem jarayon ichida: web workerlar lentalari bu yerda ko'rinmaydi
+            raise CommandError(
+                "fan_out_timelines umumiy cache backend talab qiladi (REDIS_URL), "
+                "LocMem da lenta post yaratilgan jarayonda yoziladi"
+            )
+        while True:
+            processed, written = self.process_batch(options['batch_size'])
+            if processed:
+                self.stdout.write(f'posts={processed} timelines={written}')
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
+
+    @staticmethod
+    def process_batch(batch_size):
+        # Bitta nusxada ishlaydi: yozuv lenta yangilangandan keyin o'chiriladi, shuning uchun
+        # o'rtada to'xtasa post qayta yoziladi (read() id larni to'plam sifatida birlashtiradi)
+        tasks = list(TimelineFanout.objects.select_related('post').order_by('id')[:batch_size])
+        written = 0
+        for task in tasks:
+            written += fan_out(task.post)
+            task.delete()
+        return len(tasks), written
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from qost.likes import flush
+from root.caches import is_shared
+
+
+class Command(BaseCommand):
+    help = "Cache'da yig'ilgan layk o'zgarishlarini Post.like ga bitta UPDATE bilan yozadi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=2.0, help='Flushlar orasidagi vaqt (soniya)')
+        parser.add_argument('--once', action='store_true', help='Bir marta flush qilib chiqib ketish')
+
+    def handle(self, *args, **options):
+        if not is_shared():
+            # LocMem jarayon ichida: web workerlar yozgan hisoblagichlar bu yerda ko'rinmaydi
+            raise CommandError(
+                "flush_likes umumiy cache backend talab qiladi (REDIS_URL), "
+                "LocMem da layklar darhol bazaga yoziladi"
+            )
+        while True:
+            flushed = flush()
+            if flushed:
+                self.stdout.write(f'posts={flushed}')
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,42 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from qost.models import Post
+from qost.uploads import POST_DIR
+from users.images import build_width_renditions
+
+RENDITION_WIDTHS = (320, 640, 1080)
+
+
+class Command(BaseCommand):
+    help = "Post rasmlaridan turli kenglikdagi progressive JPEG va WebP nusxalarini yasaydi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--interval', type=float, default=5.0, help='Navbat bo\'sh bo\'lganda kutish (soniya)')
+        parser.add_argument('--once', action='store_true', help='Bitta batchni ishlab chiqib ketish')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.process_batch(options['batch_size'])
+            if processed:
+                self.stdout.write(f'processed={processed}')
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
+
+    def process_batch(self, batch_size):
+        posts = list(Post.objects.filter(renditions_ready=False).only('id', 'post_image')[:batch_size])
+        for post in posts:
+            renditions = {}
+            if post.post_image:
+                try:
+                    key = Path(post.post_image.name).stem
+                    renditions = build_width_renditions(post.post_image.name, POST_DIR, key, RENDITION_WIDTHS)
+                except Exception as exc:
+                    self.stderr.write(f'post={post.id} {exc}')
+            Post.objects.filter(id=post.id).update(renditions=renditions, renditions_ready=True)
+        return len(posts)
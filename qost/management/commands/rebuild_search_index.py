@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from qost.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Postlar qidiruv indeksini noldan qayta quradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        total = get_search_backend().rebuild(batch_size=options['batch_size'])
+        self.stdout.write(f'posts={total}')
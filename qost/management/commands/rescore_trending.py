@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from qost.likes import flush
+from qost.trending import rescore
+
+
+class Command(BaseCommand):
+    help = "Trending ballarini layk va izohlardan to'liq qayta hisoblaydi (inkremental xatolarni tuzatadi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--interval', type=float, default=3600.0, help='Qayta hisoblashlar orasidagi vaqt (soniya)')
+        parser.add_argument('--once', action='store_true', help='Bir marta hisoblab chiqib ketish')
+
+    def handle(self, *args, **options):
+        while True:
+            # Kutilayotgan layklar avval yoziladi; qolganlarini rescore balldan chiqarib qo'yadi
+            flush()
+            total = rescore(batch_size=options['batch_size'])
+            self.stdout.write(f'posts={total}')
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:41
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_count(apps, schema_editor):
+    Post = apps.get_model('qost', 'Post')
+    Comment = apps.get_model('qost', 'Comment')
+    count = Comment.objects.filter(comment_post=models.OuterRef('pk')).order_by().values('comment_post').annotate(
+        total=models.Count('id')
+    ).values('total')
+    Post.objects.update(comment_count=Coalesce(models.Subquery(count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qost', '0005_like'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['comment_post', 'created_at', 'id'], name='comment_post_created_idx'),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
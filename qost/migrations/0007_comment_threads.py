@@ -0,0 +1,49 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    # Mavjud izohlar ildiz (depth=0), path - id ning 8 belgili base36 ko'rinishi
+    Comment = apps.get_model('qost', 'Comment')
+    alphabet = '0123456789abcdefghijklmnopqrstuvwxyz'
+    for comment in Comment.objects.only('id').iterator():
+        number, digits = comment.id, []
+        while number:
+            number, rest = divmod(number, 36)
+            digits.append(alphabet[rest])
+        path = ''.join(reversed(digits)).rjust(8, '0')
+        Comment.objects.filter(id=comment.id).update(path=path, depth=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qost', '0006_comment_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='qost.comment'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['comment_post', 'path'], name='comment_thread_path_idx'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def create_search_table(apps, schema_editor):
+    # FTS5 faqat SQLite da; boshqa bazalar uchun QOST_SEARCH_BACKEND almashtiriladi
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS qost_post_search "
+        "USING fts5(title, content, tags, tokenize='unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        "INSERT INTO qost_post_search (rowid, title, content, tags) "
+        "SELECT p.id, p.title, p.content, "
+        "COALESCE((SELECT group_concat(x.text, ' ') FROM qost_post_post_xtext t "
+        "JOIN qost_xtext x ON x.id = t.xtext_id WHERE t.post_id = p.id), '') "
+        "FROM qost_post p"
+    )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS qost_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qost', '0007_comment_threads'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:52
+
+from django.db import migrations, models
+
+
+def merge_duplicate_tags(apps, schema_editor):
+    # Teglar normallashtiriladi (kichik harf, '#' siz); bir xillari eng kichik id
+    # ga birlashtiriladi, shunda unique cheklovi qo'shilishi mumkin bo'ladi
+    Xtext = apps.get_model('qost', 'Xtext')
+    Through = apps.get_model('qost', 'Post').post_xtext.through
+    keep = {}
+    for xtext in Xtext.objects.order_by('id').iterator():
+        text = xtext.text.strip().lstrip('#').lower()[:100] or str(xtext.id)
+        if text not in keep:
+            keep[text] = xtext.id
+            if text != xtext.text:
+                Xtext.objects.filter(id=xtext.id).update(text=text)
+            continue
+        post_ids = Through.objects.filter(xtext_id=xtext.id).values_list('post_id', flat=True)
+        Through.objects.bulk_create(
+            [Through(post_id=post_id, xtext_id=keep[text]) for post_id in post_ids],
+            ignore_conflicts=True
+        )
+        Xtext.objects.filter(id=xtext.id).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qost', '0008_post_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tags, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='xtext',
+            name='text',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+        # Teg bo'yicha postlar (TagPostsView): xtext_id bo'yicha post_id kamayish tartibida
+        migrations.RunSQL(
+            'CREATE INDEX qost_post_xtext_tag_post_idx ON qost_post_post_xtext (xtext_id, post_id DESC)',
+            'DROP INDEX qost_post_xtext_tag_post_idx'
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:54
+
+from django.conf import settings
+import datetime
+import math
+
+from django.db import migrations, models
+
+
+def fill_trending_score(apps, schema_editor):
+    # Faqat postning o'z vaqti bo'yicha boshlang'ich ball; layk va izohlar
+    # `manage.py rescore_trending` bilan qo'shiladi
+    Post = apps.get_model('qost', 'Post')
+    epoch = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    decay = math.log(2) / (6 * 60 * 60)
+    for post_id, created_at in Post.objects.values_list('id', 'created_at').iterator():
+        Post.objects.filter(id=post_id).update(trending_score=decay * (created_at - epoch).total_seconds())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qost', '0009_unique_tags'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='trending_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-trending_score', '-id'], name='post_trending_idx'),
+        ),
+        migrations.RunPython(fill_trending_score, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,16 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
+from django.db.models import F
 
 from users.models import User
 
 
 class Xtext(models.Model):
-    text = models.TextField()
+    MAX_LENGTH = 100
+
+    # qost.tags.normalize_tag dan o'tgan teg (kichik harf, '#' siz)
+    text = models.CharField(max_length=MAX_LENGTH, unique=True)
 
     def __str__(self):
         return self.text
@@ -15,21 +21,139 @@ class Post(models.Model):
     title = models.CharField(max_length=35)
     content = models.TextField()
     like = models.IntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    # qost.trending: vaqt bilan yemiriladigan ballning logarifmi
+    trending_score = models.FloatField(default=0.0)
     post_xtext = models.ManyToManyField(Xtext, related_name='post_xtext')
     post_image = models.ImageField(upload_to='images/post/', blank=True, null=True)
+    renditions = models.JSONField(default=dict, blank=True)
+    renditions_ready = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # FeedView keyset sahifalashi (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='post_feed_idx'),
+            # process_post_images navbati
+            models.Index(fields=['id'], condition=models.Q(renditions_ready=False), name='post_renditions_pending_idx'),
+            # TrendingView: top-N shu indeksdan tartiblashsiz o'qiladi
+            models.Index(fields=['-trending_score', '-id'], name='post_trending_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        from qost.timeline import schedule
+        from qost.trending import initial_score
+
+        if not self._state.adding:
+            return super(Post, self).save(*args, **kwargs)
+        self.trending_score = initial_score()
+        with transaction.atomic():
+            super(Post, self).save(*args, **kwargs)
+            schedule(self)
+
+
+class Like(models.Model):
+    like_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='like_user')
+    like_post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='like_post')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['like_user', 'like_post'], name='unique_like'),
+        ]
+
+    def __str__(self):
+        return f'{self.like_user_id} {self.like_post_id}'
+
 
 class Comment(models.Model):
     comment_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comment_user')
     comment_post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comment_post')
+    parent = models.ForeignKey('self', on_delete=models.CASCADE, related_name='replies', blank=True, null=True)
+    path = models.CharField(max_length=255, blank=True, default='', editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # CommentListView keyset sahifalashi
+            models.Index(fields=['comment_post', 'created_at', 'id'], name='comment_post_created_idx'),
+            # qost.threads.subtree diapazon so'rovi
+            models.Index(fields=['comment_post', 'path'], name='comment_thread_path_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.comment_user_id} {self.comment_post_id}'
+
+    def save(self, *args, **kwargs):
+        # Post.comment_count izoh bilan bitta tranzaksiyada oshiriladi,
+        # kamaytirish esa qost.signals dagi post_delete da (kaskad o'chirishlarda ham)
+        # path o'z id sini ham o'z ichiga oladi, shuning uchun INSERT dan keyin yoziladi
+        from qost.threads import child_path
+        from qost.trending import COMMENT_WEIGHT, add_event
+
+        if not self._state.adding:
+            return super(Comment, self).save(*args, **kwargs)
+        with transaction.atomic():
+            super(Comment, self).save(*args, **kwargs)
+            parent = self.parent
+            self.path = child_path(parent.path if parent else '', self.id)
+            self.depth = parent.depth + 1 if parent else 0
+            Comment.objects.filter(id=self.id).update(path=self.path, depth=self.depth)
+            add_event(self.comment_post_id, self.created_at, COMMENT_WEIGHT, comment_count=F('comment_count') + 1)
+
+
+class PostUpload(models.Model):
+    MAX_SIZE = 50 * 1024 * 1024
+
+    UPLOADING = 'uploading'
+    COMPLETE = 'complete'
+    STATUS = (
+        (UPLOADING, UPLOADING),
+        (COMPLETE, COMPLETE)
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    upload_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_user')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=255, choices=STATUS, default=UPLOADING)
+    upload_post = models.ForeignKey(Post, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_post')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.upload_user_id} {self.filename}'
+
+
+class Follow(models.Model):
+    follower = models.ForeignKey(User, on_delete=models.CASCADE, related_name='following')
+    following = models.ForeignKey(User, on_delete=models.CASCADE, related_name='followers')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['follower', 'following'], name='unique_follow'),
+        ]
+        indexes = [
+            # fan_out: muallifning obunachilari
+            models.Index(fields=['following', 'follower'], name='follow_followers_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.follower_id} -> {self.following_id}'
+
+
+class TimelineFanout(models.Model):
+    # qost.timeline: umumiy cache'da obunachilar lentasiga yozish navbati (fan_out_timelines)
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
     def __str__(self):
-        return f'{self.comment_user} {self.comment_post.id}'
+        return f'{self.post_id}'
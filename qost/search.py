@@ -0,0 +1,138 @@
+import re
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils.module_loading import import_string
+
+from qost.models import Post
+
+# Postlar bo'yicha to'liq matnli qidiruv. Indeks signal'lar orqali (qost.signals)
+# tranzaksiya commit bo'lgach yangilanadi; to'liq qayta qurish:
+# `manage.py rebuild_search_index`. Boshqa dvigatel QOST_SEARCH_BACKEND orqali ulanadi.
+word_regex = re.compile(r'\w+', re.UNICODE)
+MIN_PREFIX = 3
+# Bitta IN (...) dagi id lar soni: eski SQLite da SQLITE_MAX_VARIABLE_NUMBER = 999
+ID_CHUNK = 500
+
+
+def chunks(ids, size=ID_CHUNK):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+class SearchBackend:
+    # Dvigatel interfeysi: post id lari bilan ishlaydi, natija - bm25 bo'yicha tartiblangan id lar
+
+    def index(self, post_ids):
+        raise NotImplementedError
+
+    def remove(self, post_ids):
+        raise NotImplementedError
+
+    def search(self, query, limit, offset=0):
+        raise NotImplementedError
+
+    def rebuild(self, batch_size=10000):
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(SearchBackend):
+    # qost_post_search - FTS5 virtual jadvali (0008_post_search migratsiyasi),
+    # rowid = Post.id. bm25 og'irliklari: sarlavha, matn, teglar
+    table = 'qost_post_search'
+    weights = (10.0, 1.0, 5.0)
+    documents_sql = (
+        'SELECT p.id, p.title, p.content, '
+        "COALESCE((SELECT group_concat(x.text, ' ') FROM qost_post_post_xtext t "
+        'JOIN qost_xtext x ON x.id = t.xtext_id WHERE t.post_id = p.id), \'\') '
+        'FROM qost_post p'
+    )
+
+    def index(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        alias = router.db_for_write(Post)
+        with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+            for chunk in chunks(post_ids):
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f'DELETE FROM {self.table} WHERE rowid IN ({placeholders})', chunk)
+                cursor.execute(
+                    f'INSERT INTO {self.table} (rowid, title, content, tags) '
+                    f'{self.documents_sql} WHERE p.id IN ({placeholders})',
+                    chunk
+                )
+
+    def remove(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        alias = router.db_for_write(Post)
+        with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+            for chunk in chunks(post_ids):
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f'DELETE FROM {self.table} WHERE rowid IN ({placeholders})', chunk)
+
+    def search(self, query, limit, offset=0):
+        match = self.match_expression(query)
+        if not match:
+            return []
+        weights = ', '.join(str(weight) for weight in self.weights)
+        with connections[router.db_for_read(Post)].cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s '
+                f'ORDER BY bm25({self.table}, {weights}), rowid DESC LIMIT %s OFFSET %s',
+                [match, limit, offset]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def rebuild(self, batch_size=10000):
+        # Qayta qurish bitta tranzaksiyada: xato bo'lsa eski indeks qoladi, o'quvchilar
+        # yarim bo'sh indeksni ko'rmaydi
+        alias = router.db_for_write(Post)
+        last_id, total = 0, 0
+        with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            while True:
+                ids = list(
+                    Post.objects.using(alias).filter(id__gt=last_id).order_by('id')
+                    .values_list('id', flat=True)[:batch_size]
+                )
+                if not ids:
+                    return total
+                cursor.execute(
+                    f'INSERT INTO {self.table} (rowid, title, content, tags) '
+                    f'{self.documents_sql} WHERE p.id BETWEEN %s AND %s',
+                    [ids[0], ids[-1]]
+                )
+                last_id = ids[-1]
+                total += len(ids)
+
+    @staticmethod
+    def match_expression(query):
+        # Foydalanuvchi matni FTS5 sintaksisiga tushmasligi uchun har bir so'z
+        # qo'shtirnoqqa olinadi, oxirgisi prefiks sifatida qidiriladi (juda qisqa
+        # prefiks deyarli butun indeksni bm25 bilan tartiblashga majbur qiladi)
+        words = word_regex.findall(query)
+        if not words:
+            return ''
+        terms = [f'"{word}"' for word in words]
+        if len(words[-1]) >= MIN_PREFIX:
+            terms[-1] += '*'
+        return ' '.join(terms)
+
+
+def get_search_backend():
+    return import_string(getattr(settings, 'QOST_SEARCH_BACKEND', 'qost.search.SQLiteFTSBackend'))()
+
+
+def schedule_index(post_ids):
+    post_ids = list(post_ids)
+    if post_ids:
+        transaction.on_commit(lambda: get_search_backend().index(post_ids))
+
+
+def schedule_remove(post_ids):
+    post_ids = list(post_ids)
+    if post_ids:
+        transaction.on_commit(lambda: get_search_backend().remove(post_ids))
@@ -0,0 +1,72 @@
+from rest_framework import serializers
+
+from qost.models import Comment, Post, PostUpload
+from qost.tags import attach_tags
+from qost.threads import MAX_DEPTH
+from qost.uploads import current_offset
+
+
+class PostUploadSerializer(serializers.ModelSerializer):
+    offset = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PostUpload
+        fields = ['id', 'filename', 'size', 'offset', 'status']
+        read_only_fields = ['id', 'status']
+
+    def get_offset(self, instance):
+        return current_offset(instance)
+
+    def validate_size(self, size):
+        if size > PostUpload.MAX_SIZE:
+            data = {
+                'status': False,
+                'message': f'Fayl hajmi {PostUpload.MAX_SIZE} baytdan oshmasligi kerak!'
+            }
+            raise serializers.ValidationError(data)
+        return size
+
+
+class UploadCompleteSerializer(serializers.Serializer):
+    post = serializers.IntegerField(write_only=True)
+
+
+class PostSerializer(serializers.ModelSerializer):
+    post_user = serializers.CharField(source='post_user.username', read_only=True)
+    tags = serializers.SlugRelatedField(source='post_xtext', slug_field='text', many=True, read_only=True)
+
+    class Meta:
+        model = Post
+        fields = [
+            'id', 'post_user', 'title', 'content', 'like', 'comment_count', 'tags',
+            'post_image', 'renditions', 'created_at'
+        ]
+        read_only_fields = ['like', 'comment_count', 'post_image', 'renditions', 'created_at']
+
+    def create(self, validated_data):
+        post = super(PostSerializer, self).create(validated_data)
+        attach_tags(post)
+        return post
+
+    def update(self, instance, validated_data):
+        post = super(PostSerializer, self).update(instance, validated_data)
+        attach_tags(post)
+        return post
+
+
+class CommentSerializer(serializers.ModelSerializer):
+    comment_user = serializers.CharField(source='comment_user.username', read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ['id', 'comment_user', 'parent', 'depth', 'text', 'created_at']
+        read_only_fields = ['depth', 'created_at']
+
+    def validate_parent(self, parent):
+        if parent is not None and parent.depth >= MAX_DEPTH:
+            data = {
+                'status': False,
+                'message': f'Javoblar chuqurligi {MAX_DEPTH} dan oshmasligi kerak!'
+            }
+            raise serializers.ValidationError(data)
+        return parent
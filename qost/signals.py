@@ -0,0 +1,52 @@
+from django.db.models import F, Value
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from qost import search, trending
+from qost.models import Comment, Post, Xtext
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    # Collector o'chirishni tranzaksiya ichida bajaradi, signal ham shu tranzaksiyada
+    Post.objects.filter(id=instance.comment_post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1,
+        trending_score=trending.log_sub(
+            F('trending_score'), Value(trending.event_score(instance.created_at, trending.COMMENT_WEIGHT))
+        )
+    )
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    search.schedule_index([instance.id])
+
+
+@receiver(post_delete, sender=Post)
+def remove_post(sender, instance, **kwargs):
+    search.schedule_remove([instance.id])
+
+
+@receiver(m2m_changed, sender=Post.post_xtext.through)
+def index_post_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear', 'post_clear'):
+        return
+    if not reverse:
+        if action != 'pre_clear':
+            search.schedule_index([instance.id])
+    elif action == 'pre_clear':
+        # clear() dan keyin qaysi postlarda bu teg bo'lgani noma'lum bo'ladi
+        search.schedule_index(instance.post_xtext.values_list('id', flat=True))
+    elif action != 'post_clear':
+        search.schedule_index(pk_set)
+
+
+@receiver(post_save, sender=Xtext)
+def index_tag_posts(sender, instance, created, **kwargs):
+    if not created:
+        search.schedule_index(instance.post_xtext.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Xtext)
+def reindex_tag_posts(sender, instance, **kwargs):
+    search.schedule_index(instance.post_xtext.values_list('id', flat=True))
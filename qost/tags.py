@@ -0,0 +1,47 @@
+import re
+
+from django.db import transaction
+
+from qost import search
+from qost.models import Post, Xtext
+
+# Teglar post matnidan olinadi (#sayohat) va Xtext da bitta nusxada, kichik harfda
+# saqlanadi. Biriktirish so'rovlar soni teglar soniga bog'liq emas:
+# bulk_create(ignore_conflicts) + in_bulk + through jadvaliga bitta bulk_create.
+tag_regex = re.compile(r'#(\w+)', re.UNICODE)
+MAX_TAGS = 30
+
+
+def normalize_tag(text):
+    return text.strip().lstrip('#').lower()[:Xtext.MAX_LENGTH]
+
+
+def extract_tags(*texts):
+    tags = []
+    for text in texts:
+        for match in tag_regex.findall(text or ''):
+            tag = normalize_tag(match)
+            if tag and tag not in tags:
+                tags.append(tag)
+    return tags[:MAX_TAGS]
+
+
+@transaction.atomic
+def attach_tags(post):
+    tags = extract_tags(post.title, post.content)
+    through = Post.post_xtext.through
+    if tags:
+        Xtext.objects.bulk_create([Xtext(text=tag) for tag in tags], ignore_conflicts=True)
+        tag_ids = [xtext.id for xtext in Xtext.objects.in_bulk(tags, field_name='text').values()]
+    else:
+        tag_ids = []
+
+    through.objects.filter(post_id=post.id).exclude(xtext_id__in=tag_ids).delete()
+    through.objects.bulk_create(
+        [through(post_id=post.id, xtext_id=tag_id) for tag_id in tag_ids],
+        ignore_conflicts=True
+    )
+    # bulk_create m2m_changed signalini chaqirmaydi
+    search.schedule_index([post.id])
+    getattr(post, '_prefetched_objects_cache', {}).pop('post_xtext', None)
+    return tag_ids
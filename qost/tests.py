@@ -1,3 +1,513 @@
-from django.test import TestCase
+import datetime
+import io
+import os
+import tempfile
+import threading
+import tracemalloc
+import uuid
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from qost import likes, search, timeline, trending, uploads
+from qost.management.commands.fan_out_timelines import Command as FanOutTimelines
+from qost.models import Comment, Follow, Like, Post, PostUpload, TimelineFanout, Xtext
+from qost.pagination import KeysetPagination
+from qost.views import PostUploadView
+from users.models import User
+
+
+def make_users(count, prefix='user'):
+    return User.objects.bulk_create([
+        User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com') for i in range(count)
+    ])
+
+
+@override_settings(QOST_LIKE_BUFFER=True)
+class LikeBufferTests(TransactionTestCase):
+    likes_count = 2000
+    threads_count = 8
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username='author', email='author@example.com')
+        self.post = Post.objects.create(post_user=self.author, title='post', content='content')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_concurrent_likes_are_counted_exactly(self):
+        # Layk yozuvlari oldindan yaratiladi: SQLite test bazasi parallel yozuvchilarni
+        # ko'tarmaydi, poyga esa cache'dagi hisoblagich va navbatda
+        users = make_users(self.likes_count)
+        Like.objects.bulk_create([Like(like_user=user, like_post=self.post) for user in users])
+        per_thread = self.likes_count // self.threads_count
+        moment = timezone.now()
+        done = threading.Event()
+        errors = []
+
+        def liker():
+            try:
+                for _ in range(per_thread):
+                    likes.add_delta(self.post.id, 1, moment)
+            except Exception as exc:
+                errors.append(exc)
+
+        def flusher():
+            try:
+                while not done.is_set():
+                    likes.flush()
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=liker) for _ in range(self.threads_count)]
+        flush_thread = threading.Thread(target=flusher)
+        flush_thread.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        done.set()
+        flush_thread.join()
+        likes.flush()
+
+        self.assertEqual(errors, [])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like, self.likes_count)
+        self.assertEqual(likes.pending_delta(self.post.id), 0)
+
+    def test_duplicate_like_is_not_counted(self):
+        user = make_users(1)[0]
+        self.assertTrue(likes.like(user, self.post))
+        self.assertFalse(likes.like(user, self.post))
+        likes.flush()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like, 1)
+
+    def test_flush_writes_buffered_likes_in_one_update(self):
+        # Har layk uchun alohida UPDATE o'rniga flush bitta so'rov yuboradi
+        for user in make_users(500):
+            likes.like(user, self.post)
+        with CaptureQueriesContext(connection) as queries:
+            likes.flush()
+        # BEGIN/COMMIT dan tashqari bitta UPDATE
+        self.assertEqual([query['sql'].split()[0] for query in queries], ['BEGIN', 'UPDATE', 'COMMIT'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like, 500)
+
+    def test_flush_between_sequence_and_slot_keeps_post_queued(self):
+        shared = caches['default']
+
+        class RacingCache:
+            # seq oshirilgan, slot hali yozilmagan paytda flush ishga tushadi
+            def __getattr__(self, name):
+                return getattr(shared, name)
+
+            def set(self, key, *args, **kwargs):
+                if key.startswith('like-dirty-slot:'):
+                    likes.flush()
+                return shared.set(key, *args, **kwargs)
+
+        first, second, third = make_users(3)
+        with mock.patch.object(likes, 'cache', RacingCache()):
+            likes.like(first, self.post)
+            likes.like(second, self.post)
+        likes.flush()
+        likes.like(third, self.post)
+        likes.flush()
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like, 3)
+        self.assertEqual(likes.pending_delta(self.post.id), 0)
+
+    def test_failed_update_keeps_buffered_likes(self):
+        users = make_users(4)
+        for user in users[:3]:
+            likes.like(user, self.post)
+        with mock.patch('django.db.models.query.QuerySet.update', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(OperationalError):
+                likes.flush()
+        self.assertEqual(likes.pending_delta(self.post.id), 3)
+        likes.like(users[3], self.post)
+        likes.flush()
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like, 4)
+        self.assertEqual(likes.pending_delta(self.post.id), 0)
+        self.assertEqual(likes.flush(), 0)
+
+
+@override_settings(QOST_LIKE_BUFFER=None)
+class LikeWithoutSharedCacheTests(TestCase):
+
+    def test_like_is_written_immediately(self):
+        author = User.objects.create(username='author', email='author@example.com')
+        post = Post.objects.create(post_user=author, title='post', content='content')
+        likes.like(author, post)
+        self.assertEqual(Post.objects.get(id=post.id).like, 1)
+        self.assertEqual(likes.pending_delta(post.id), 0)
+
+
+class TrendingScoreTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username='author', email='author@example.com')
+        self.users = make_users(5)
+        self.start = timezone.now()
+
+    def tearDown(self):
+        cache.clear()
+
+    def at(self, hours):
+        return mock.patch('django.utils.timezone.now', return_value=self.start + datetime.timedelta(hours=hours))
+
+    def assert_matches_recompute(self, post):
+        post.refresh_from_db()
+        expected = trending.compute({post.id: post.created_at})[post.id]
+        self.assertAlmostEqual(post.trending_score, expected, places=6)
+
+    def flush(self):
+        # flush hisoblagichlarni on_commit da ayiradi, TestCase esa tranzaksiyani yopmaydi
+        with self.captureOnCommitCallbacks(execute=True):
+            likes.flush()
+
+    def run_events(self):
+        with self.at(0):
+            post = Post.objects.create(post_user=self.author, title='post', content='content')
+        for hours, user in zip([0.5, 1, 2, 3], self.users):
+            with self.at(hours):
+                likes.like(user, post)
+        with self.at(4):
+            Comment.objects.create(comment_user=self.author, comment_post=post, text='izoh')
+            self.flush()
+        # Layk va unlike turli flushlarda, 12 soat farq bilan
+        with self.at(16):
+            likes.unlike(self.users[0], post)
+            likes.like(self.users[4], post)
+            likes.unlike(self.users[4], post)
+            self.flush()
+        with self.at(17):
+            likes.unlike(self.users[2], post)
+            self.flush()
+        return post
+
+    @override_settings(QOST_LIKE_BUFFER=True)
+    def test_buffered_scores_match_recompute(self):
+        self.assert_matches_recompute(self.run_events())
+
+    @override_settings(QOST_LIKE_BUFFER=False)
+    def test_direct_scores_match_recompute(self):
+        self.assert_matches_recompute(self.run_events())
+
+    @override_settings(QOST_LIKE_BUFFER=True)
+    def test_rescore_ignores_pending_likes(self):
+        post = self.run_events()
+        # Oxirgi flush dan keyin kelgan layk va unlike
+        with self.at(18):
+            likes.like(self.users[0], post)
+            likes.unlike(self.users[1], post)
+        compute, arrived = trending.compute, []
+
+        def compute_with_new_like(posts, pending=None):
+            # Rescore o'rtasida yana bir layk
+            if not arrived:
+                with self.at(18.5):
+                    arrived.append(likes.like(self.users[2], post))
+            return compute(posts, pending)
+
+        with mock.patch.object(trending, 'compute', compute_with_new_like):
+            trending.rescore()
+        self.flush()
+        self.assertEqual(arrived, [True])
+        self.assertEqual(Post.objects.get(id=post.id).like, 3)
+        self.assert_matches_recompute(post)
+
+    def test_rescore_matches_compute(self):
+        post = self.run_events()
+        Post.objects.filter(id=post.id).update(trending_score=0)
+        trending.rescore()
+        self.assert_matches_recompute(post)
+
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='searcher', email='searcher@example.com')
+        self.backend = search.get_search_backend()
+
+    def create(self, title, content='', tags=()):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(post_user=self.user, title=title, content=content)
+            for tag in tags:
+                post.post_xtext.create(text=tag)
+        return post
+
+    def test_saved_and_deleted_posts_are_indexed(self):
+        post = self.create('giraffe', 'tall')
+        self.assertEqual(self.backend.search('giraffe', 10), [post.id])
+        post.title = 'zebra'
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        self.assertEqual(self.backend.search('giraffe', 10), [])
+        self.assertEqual(self.backend.search('zeb', 10), [post.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        self.assertEqual(self.backend.search('zebra', 10), [])
+
+    def test_title_outranks_tags_and_content(self):
+        in_content = self.create('evening', 'sunset over the sea')
+        in_tags = self.create('evening', tags=['sunset'])
+        in_title = self.create('sunset', 'evening')
+        self.assertEqual(self.backend.search('sunset', 10), [in_title.id, in_tags.id, in_content.id])
+
+    def test_index_chunks_long_id_lists(self):
+        # SQLite eski versiyalarida bitta so'rovda 999 tadan ortiq parametr bo'lmaydi
+        posts = Post.objects.bulk_create(
+            Post(post_user=self.user, title='bulk', content='bulk') for _ in range(search.ID_CHUNK * 2 + 1)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.backend.index([post.id for post in posts])
+        inserts = [query['sql'] for query in queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(len(self.backend.search('bulk', len(posts) + 1)), len(posts))
+
+    def test_failed_rebuild_keeps_old_index(self):
+        post = self.create('kept')
+        with mock.patch.object(Post.objects, 'using', side_effect=OperationalError), \
+                self.assertRaises(OperationalError):
+            self.backend.rebuild()
+        self.assertEqual(self.backend.search('kept', 10), [post.id])
+        self.assertEqual(self.backend.rebuild(), 1)
+        self.assertEqual(self.backend.search('kept', 10), [post.id])
+
+
+class ZeroStream(io.RawIOBase):
+    # Xotirada saqlanmaydigan katta so'rov tanasi
+    def __init__(self, size):
+        self.remaining = size
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        self.remaining -= size
+        return bytes(size)
+
+
+class PostUploadTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.user = User.objects.create(username='uploader', email='uploader@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_upload(self, filename, size):
+        return PostUpload.objects.create(upload_user=self.user, filename=filename, size=size)
+
+    def patch_stream(self, upload, size):
+        request = APIRequestFactory().generic(
+            'PATCH', reverse('upload', args=[upload.id]), b'',
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0'
+        )
+        request.META['CONTENT_LENGTH'] = str(size)
+        request._stream = ZeroStream(size)
+        force_authenticate(request, self.user)
+        return PostUploadView.as_view()(request, pk=upload.id)
+
+    def test_peak_memory_does_not_grow_with_upload_size(self):
+        peaks = []
+        for size in (8 * 1024 * 1024, 48 * 1024 * 1024):
+            upload = self.create_upload('big.jpg', size)
+            tracemalloc.start()
+            response = self.patch_stream(upload, size)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            self.assertEqual(response.data['offset'], size)
+        # Bo'laklar CHUNK_SIZE dan oshmaydi: 6 barobar katta faylda ham cho'qqi bir xil
+        for peak in peaks:
+            self.assertLess(peak, 1024 * 1024)
+        self.assertLess(peaks[1], peaks[0] * 2)
+
+    def test_extension_comes_from_detected_format(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (32, 32), 'red').save(buffer, 'PNG')
+        content = buffer.getvalue()
+        upload = self.create_upload('x.html', len(content))
+        post = Post.objects.create(post_user=self.user, title='post', content='content')
+
+        response = self.client.generic(
+            'PATCH', reverse('upload', args=[upload.id]), content,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0'
+        )
+        self.assertEqual(response.data['offset'], len(content))
+        response = self.client.post(reverse('upload-complete', args=[upload.id]), {'post': post.id}, format='json')
+        self.assertEqual(response.status_code, 200)
+        post.refresh_from_db()
+        self.assertTrue(post.post_image.name.endswith('.png'))
+
+    def test_concurrent_patch_is_rejected(self):
+        upload = self.create_upload('x.jpg', 10)
+        with uploads.locked_part(upload):
+            response = self.client.generic(
+                'PATCH', reverse('upload', args=[upload.id]), b'0123456789',
+                content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0'
+            )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(uploads.current_offset(upload), 0)
+
+    def test_reaper_removes_only_abandoned_uploads(self):
+        old = timezone.now() - datetime.timedelta(days=2)
+        abandoned, active, fresh = (self.create_upload(f'{name}.jpg', 10) for name in ('abandoned', 'active', 'fresh'))
+        PostUpload.objects.filter(id__in=[abandoned.id, active.id]).update(updated_at=old)
+        for upload in (abandoned, active):
+            with uploads.locked_part(upload) as target:
+                target.write(b'01234')
+        os.utime(uploads.part_path(abandoned), (old.timestamp(), old.timestamp()))
+        orphan = uploads.uploads_dir() / f'{uuid.uuid4()}.part'
+        orphan.write_bytes(b'0')
+        os.utime(orphan, (old.timestamp(), old.timestamp()))
+
+        out = io.StringIO()
+        call_command('clear_uploads', max_age=24, chunk_size=1, stdout=out)
+        self.assertEqual(out.getvalue().strip(), 'uploads=1 parts=1')
+        self.assertCountEqual(PostUpload.objects.values_list('id', flat=True), [active.id, fresh.id])
+        self.assertFalse(uploads.part_path(abandoned).exists())
+        self.assertFalse(orphan.exists())
+        # Qatori eski bo'lsa ham .part fayliga yaqinda yozilgan yuklash qoladi
+        self.assertEqual(uploads.current_offset(active), 5)
+
+
+class TimelineTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create(username='reader', email='reader@example.com')
+        self.authors = make_users(4, prefix='author')
+        Follow.objects.bulk_create([Follow(follower=self.reader, following=author) for author in self.authors])
+
+    def tearDown(self):
+        cache.clear()
+
+    def create_posts(self, count):
+        return [
+            Post.objects.create(post_user=self.authors[i % len(self.authors)], title='post', content='content')
+            for i in range(count)
+        ]
+
+    def test_concurrent_pushes_are_not_lost(self):
+        timeline.read(self.reader)
+        posts = self.create_posts(200)
+        chunks = [posts[i::8] for i in range(8)]
+
+        def pusher(chunk):
+            for post in chunk:
+                timeline.push([self.reader.id], post.id)
+
+        threads = [threading.Thread(target=pusher, args=(chunk,)) for chunk in chunks]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ids = timeline.read(self.reader, limit=500)
+        self.assertEqual(ids, sorted((post.id for post in posts), reverse=True))
+
+    def test_unwritten_slot_is_merged_on_next_read(self):
+        timeline.read(self.reader)
+        first, second = self.create_posts(2)
+        # seq oshirilgan, slot hali yozilmagan holat
+        cache.incr(timeline.seq_key(self.reader.id))
+        timeline.push([self.reader.id], second.id)
+        self.assertEqual(timeline.read(self.reader), [second.id])
+        seq = cache.get(timeline.seq_key(self.reader.id))
+        cache.set(timeline.slot_key(self.reader.id, seq - 1), first.id)
+        self.assertEqual(timeline.read(self.reader), [second.id, first.id])
+
+    def test_pages_continue_past_cached_window(self):
+        posts = self.create_posts(12)
+        expected = sorted((post.id for post in posts), reverse=True)
+        with mock.patch.object(timeline, 'TIMELINE_SIZE', 5):
+            pages, before = [], None
+            while True:
+                page = timeline.read(self.reader, before, limit=4)
+                if not page:
+                    break
+                pages.extend(page)
+                before = page[-1]
+        self.assertEqual(pages, expected)
+
+
+    def test_celebrity_posts_survive_cache_eviction(self):
+        timeline.read(self.reader)
+        with mock.patch.object(timeline, 'FANOUT_LIMIT', 0), self.captureOnCommitCallbacks(execute=True):
+            post = self.create_posts(1)[0]
+        self.assertTrue(User.objects.get(id=post.post_user_id).is_celebrity)
+        # Belgi cache'da emas: lenta kalitlaridan boshqa hamma narsa yo'qolsa ham post ko'rinadi
+        cache.delete_many([key for key in list(caches['default']._cache) if 'timeline' not in key])
+        self.assertEqual(timeline.read(self.reader), [post.id])
+
+    def test_push_skips_followers_without_cached_timeline(self):
+        timeline.read(self.reader)
+        post = self.create_posts(1)[0]
+        self.assertEqual(timeline.push([self.reader.id, self.authors[1].id], post.id), 1)
+        self.assertIsNone(cache.get(timeline.seq_key(self.authors[1].id)))
+
+    @override_settings(QOST_TIMELINE_WORKER=True)
+    def test_worker_fans_out_queued_posts(self):
+        timeline.read(self.reader)
+        with self.captureOnCommitCallbacks(execute=True):
+            post = self.create_posts(1)[0]
+        self.assertEqual(timeline.read(self.reader), [])
+        self.assertEqual(FanOutTimelines.process_batch(10), (1, 1))
+        self.assertFalse(TimelineFanout.objects.exists())
+        self.assertEqual(timeline.read(self.reader), [post.id])
+
+class FeedQueryTests(TestCase):
+
+    def setUp(self):
+        authors = make_users(5, prefix='writer')
+        tags = Xtext.objects.bulk_create([Xtext(text=f'tag{i}') for i in range(3)])
+        for i in range(60):
+            post = Post.objects.create(post_user=authors[i % 5], title='post', content='content')
+            post.post_xtext.set(tags[:i % 3 + 1])
+        self.client = APIClient()
+        self.client.force_authenticate(authors[0])
+
+    def page_queries(self, page_size, cursor_page=False):
+        url = f'{reverse("feed")}?page_size={page_size}'
+        if cursor_page:
+            url = self.client.get(url).data['next']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), page_size)
+        return len(queries)
+
+    def test_page_query_count_does_not_depend_on_page_size(self):
+        small, large = self.page_queries(5), self.page_queries(50)
+        self.assertEqual(small, large)
+        # Postlar (+muallif) va teglar
+        self.assertEqual(large, 2)
+        self.assertEqual(self.page_queries(5, cursor_page=True), self.page_queries(25, cursor_page=True))
+
+    def test_cursor_filter_seeks_index_range(self):
+        paginator = KeysetPagination()
+        paginator.fields = [Post._meta.get_field(name.lstrip('-')) for name in paginator.ordering]
+        post = Post.objects.order_by(*paginator.ordering)[10]
+        plan = Post.objects.filter(paginator.after([post.created_at, post.id])).order_by(*paginator.ordering)[:20].explain()
+        # Faqat OR sharti bilan sqlite indeksni boshidan skan qiladi
+        self.assertIn('created_at<', plan)
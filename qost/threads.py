@@ -0,0 +1,54 @@
+from qost.models import Comment
+
+# Javoblar materialized path bilan saqlanadi: har bir ajdod id si 8 belgili
+# base36 segment ('0000002s0000002t'). Shunda butun thread yoki uning
+# bir qismi (comment_post, path) indeksidan bitta diapazon so'rovi bilan o'qiladi.
+ALPHABET = '0123456789abcdefghijklmnopqrstuvwxyz'
+SEGMENT = 8
+MAX_DEPTH = 30
+# Alfavitdagi barcha belgilardan katta: path < prefix + PATH_END diapazon chegarasi
+PATH_END = '~'
+FIELDS = ('id', 'comment_user', 'parent', 'depth', 'text', 'created_at')
+
+
+def encode(comment_id):
+    digits = []
+    while comment_id:
+        comment_id, rest = divmod(comment_id, len(ALPHABET))
+        digits.append(ALPHABET[rest])
+    return ''.join(reversed(digits)).rjust(SEGMENT, '0')
+
+
+def child_path(parent_path, comment_id):
+    return parent_path + encode(comment_id)
+
+
+def subtree(root, depth=None):
+    # LIKE 'x%' o'rniga >= / < : SQLite va boshqa bazalarda ham indeks diapazoni
+    comments = Comment.objects.filter(
+        comment_post_id=root.comment_post_id,
+        path__gte=root.path,
+        path__lt=root.path + PATH_END
+    )
+    if depth is not None:
+        comments = comments.filter(depth__lte=root.depth + depth)
+    # Minglab javoblar uchun model/serializer o'rniga CommentSerializer ko'rinishidagi lug'atlar
+    rows = comments.order_by('path').values_list(
+        'id', 'comment_user__username', 'parent_id', 'depth', 'text', 'created_at'
+    )
+    return [dict(zip(FIELDS, row)) for row in rows]
+
+
+def build_tree(rows):
+    # rows path bo'yicha tartiblangan: ota har doim bolasidan oldin keladi
+    nodes = {}
+    roots = []
+    for row in rows:
+        row['replies'] = []
+        nodes[row['id']] = row
+        parent = nodes.get(row['parent'])
+        if parent is None:
+            roots.append(row)
+        else:
+            parent['replies'].append(row)
+    return roots
@@ -0,0 +1,154 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from qost.models import Follow, Post, TimelineFanout
+from root.caches import is_shared
+from users.models import User
+
+# Gibrid lenta: oddiy mualliflarning yangi posti obunachilarning cache'dagi
+# lentasiga yoziladi (fan-out-on-write), obunachisi FANOUT_LIMIT dan ko'p
+# mualliflarniki esa o'qish paytida qo'shiladi (fan-out-on-read).
+# Lenta cache'da (ids, upto) ko'rinishida turadi. push ro'yxatni qayta yozmaydi (bir vaqtda
+# yozgan ikki muallifdan biri yo'qolardi): obunachining seq hisoblagichi incr qilinadi va
+# post id alohida slotga yoziladi; read() upto dan keyingi slotlarni ro'yxatga qo'shadi.
+# Umumiy cache'da har obunachiga bir nechta tarmoq so'rovi ketadi, shuning uchun fan-out
+# so'rov ichida emas, `manage.py fan_out_timelines` worker ida bajariladi (TimelineFanout navbati).
+TIMELINE_SIZE = getattr(settings, 'TIMELINE_SIZE', 500)
+TIMELINE_TTL = getattr(settings, 'TIMELINE_TTL', 60 * 60 * 24)
+FANOUT_LIMIT = getattr(settings, 'TIMELINE_FANOUT_LIMIT', 10000)
+FANOUT_BATCH = 1000
+
+
+def timeline_key(user_id):
+    return f'timeline:{user_id}'
+
+
+def seq_key(user_id):
+    return f'timeline-seq:{user_id}'
+
+
+def slot_key(user_id, seq):
+    return f'timeline-slot:{user_id}:{seq}'
+
+
+def deferred():
+    enabled = getattr(settings, 'QOST_TIMELINE_WORKER', None)
+    return is_shared() if enabled is None else enabled
+
+
+def schedule(post):
+    # Post.save tranzaksiyasi ichida: navbat yozuvi post bilan birga commit bo'ladi
+    if deferred():
+        TimelineFanout.objects.create(post=post)
+    else:
+        transaction.on_commit(lambda: fan_out(post))
+
+
+def fan_out(post):
+    author_id = post.post_user_id
+    followers = Follow.objects.filter(following_id=author_id)
+    if followers.count() > FANOUT_LIMIT:
+        # Belgi bazada saqlanadi va qaytarib olinmaydi: o'chirilsa, shu paytgacha
+        # o'qishda qo'shilgan postlar obunachilar lentasidan yo'qolardi
+        User.objects.filter(id=author_id, is_celebrity=False).update(is_celebrity=True)
+        return 0
+
+    written = 0
+    batch = [author_id]
+    for follower_id in followers.values_list('follower_id', flat=True).iterator(chunk_size=FANOUT_BATCH):
+        batch.append(follower_id)
+        if len(batch) >= FANOUT_BATCH:
+            written += push(batch, post.id)
+            batch = []
+    if batch:
+        written += push(batch, post.id)
+    return written
+
+
+def push(user_ids, post_id):
+    # Faqat cache'da bor lentalar yangilanadi: seq lar bitta get_many bilan tekshiriladi,
+    # incr faqat ular uchun (oraliqda eskirgan seq da incr ValueError beradi). Lentasi
+    # yo'qlari o'qilganda bazadan qayta quriladi
+    active = cache.get_many([seq_key(user_id) for user_id in user_ids])
+    slots = {}
+    for user_id in user_ids:
+        if seq_key(user_id) not in active:
+            continue
+        try:
+            seq = cache.incr(seq_key(user_id))
+        except ValueError:
+            continue
+        slots[slot_key(user_id, seq)] = post_id
+    cache.set_many(slots, TIMELINE_TTL)
+    return len(slots)
+
+
+def invalidate(user_id):
+    cache.delete(timeline_key(user_id))
+
+
+def pull(user, before=None, limit=TIMELINE_SIZE, authors=None):
+    if authors is None:
+        authors = list(Follow.objects.filter(follower=user).values_list('following_id', flat=True)) + [user.id]
+    posts = Post.objects.filter(post_user_id__in=authors)
+    if before is not None:
+        posts = posts.filter(id__lt=before)
+    return list(posts.order_by('-id').values_list('id', flat=True)[:limit])
+
+
+def build(user):
+    # seq pull dan oldin yaratiladi: keyingi pushlar slotga tushadi, oldingilari pull da ko'rinadi.
+    # Boshlang'ich qiymat vaqtdan olinadi, shunda oldingi seq ning eski slotlari qayta o'qilmaydi
+    counter = seq_key(user.id)
+    cache.add(counter, time.time_ns() // 1000, TIMELINE_TTL)
+    upto = cache.get(counter)
+    ids = pull(user, limit=TIMELINE_SIZE)
+    if upto is not None:
+        cache.set(timeline_key(user.id), (ids, upto), TIMELINE_TTL)
+    return ids
+
+
+def load(user):
+    key, counter = timeline_key(user.id), seq_key(user.id)
+    cached = cache.get_many([key, counter])
+    if key not in cached or counter not in cached:
+        return build(user)
+    ids, upto = cached[key]
+    current = cached[counter]
+    if current <= upto:
+        return ids
+
+    start = max(upto, current - TIMELINE_SIZE) + 1
+    slots = cache.get_many([slot_key(user.id, seq) for seq in range(start, current + 1)])
+    # incr qilingan, lekin hali yozilmagan slotdan upto o'tmaydi: u keyingi o'qishda qo'shiladi
+    done, pushed = start - 1, set()
+    for seq in range(start, current + 1):
+        post_id = slots.get(slot_key(user.id, seq))
+        if post_id is not None:
+            pushed.add(post_id)
+            if done == seq - 1:
+                done = seq
+    ids = sorted(set(ids) | pushed, reverse=True)[:TIMELINE_SIZE]
+    if done > upto:
+        cache.set(key, (ids, done), TIMELINE_TTL)
+    return ids
+
+
+def read(user, before=None, limit=20):
+    ids = load(user)
+    # Ro'yxat TIMELINE_SIZE ga yetgan bo'lsa, undan eski postlar cache'da yo'q
+    floor = ids[-1] if len(ids) >= TIMELINE_SIZE else None
+    if before is not None:
+        ids = [post_id for post_id in ids if post_id < before]
+    if floor is not None and len(ids) < limit:
+        ids = ids + pull(user, floor if before is None else min(before, floor), limit - len(ids))
+
+    followed = list(
+        Follow.objects.filter(follower=user, following__is_celebrity=True).values_list('following_id', flat=True)
+    )
+    if followed:
+        ids = sorted(set(ids) | set(pull(user, before, limit, followed)), reverse=True)
+    return ids[:limit]
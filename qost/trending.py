@@ -0,0 +1,153 @@
+import datetime
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+
+from qost.models import Comment, Like, Post
+
+# Trending ball: har bir hodisa (post, layk, izoh) og'irligi yarim yemirilish
+# davri bilan eksponensial kamayadi: sum(w * exp(-L * (now - t))). now barcha
+# postlar uchun umumiy, shuning uchun Post.trending_score da
+# log(sum(w * exp(L * (t - EPOCH)))) saqlanadi: tartib bir xil, qiymat esa
+# toshmaydi va yangi hodisa logaddexp bilan bitta UPDATE da qo'shiladi.
+EPOCH = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+HALF_LIFE = getattr(settings, 'TRENDING_HALF_LIFE', 6 * 60 * 60)
+DECAY = math.log(2) / HALF_LIFE
+POST_WEIGHT = 1.0
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+# log_sub da 0 ning logarifmini olmaslik uchun
+MIN_RATIO = 1e-12
+# Layklar vaqti shu aniqlikda (soniya) yaxlitlanadi: flush_likes bo'laklar bo'yicha yig'adi
+LIKE_BUCKET = 60
+
+
+def event_score(moment, weight):
+    return DECAY * (moment - EPOCH).total_seconds() + math.log(weight)
+
+
+def log_add(current, value):
+    # log(exp(current) + exp(value)), katta qiymat tashqariga chiqarilgan holda
+    return Greatest(current, value) + Ln(1 + Exp(-Abs(current - value)))
+
+
+def log_sub(current, value):
+    return current + Ln(Greatest(1 - Exp(value - current), Value(MIN_RATIO)))
+
+
+def add_event(post_id, moment, weight, **updates):
+    value = Value(event_score(moment, weight))
+    return Post.objects.filter(id=post_id).update(trending_score=log_add(F('trending_score'), value), **updates)
+
+
+def remove_event(post_id, moment, weight, **updates):
+    value = Value(event_score(moment, weight))
+    return Post.objects.filter(id=post_id).update(trending_score=log_sub(F('trending_score'), value), **updates)
+
+
+def like_bucket(moment):
+    return int(moment.timestamp() // LIKE_BUCKET)
+
+
+def bucket_moment(bucket):
+    return datetime.datetime.fromtimestamp(bucket * LIKE_BUCKET, tz=datetime.timezone.utc)
+
+
+def like_deltas_expression(deltas):
+    # deltas: {post_id: {bucket: delta}}. Layk o'z created_at bo'lagi vaqtida qo'shiladi,
+    # unlike esa xuddi shu bo'lakdan ayiriladi: qaysi flushda kelganidan qat'i nazar
+    # ayirilgan qiymat avval qo'shilgani bilan bir xil. Qo'shishlar ayirishdan oldin.
+    whens = []
+    for post_id, buckets in deltas.items():
+        added = [event_score(bucket_moment(bucket), LIKE_WEIGHT * delta) for bucket, delta in buckets.items() if delta > 0]
+        removed = [event_score(bucket_moment(bucket), LIKE_WEIGHT * -delta) for bucket, delta in buckets.items() if delta < 0]
+        if not added and not removed:
+            continue
+        expression = F('trending_score')
+        if added:
+            expression = log_add(expression, Value(log_sum(added)))
+        if removed:
+            expression = log_sub(expression, Value(log_sum(removed)))
+        whens.append(When(id=post_id, then=expression))
+    return Case(*whens, default=F('trending_score'), output_field=FloatField())
+
+
+def log_sum(scores):
+    peak = max(scores)
+    return peak + math.log(sum(math.exp(score - peak) for score in scores))
+
+
+def compute(posts, pending=None):
+    # posts: {id: created_at}; barcha hodisalardan to'liq qayta hisoblash. pending - hali
+    # flush qilinmagan layk o'zgarishlari (qost.likes.pending_deltas): ular Like jadvalida
+    # bor, lekin flush ularni keyin yana qo'shadi, shuning uchun natijadan chiqarib qo'yiladi
+    scores = {post_id: [event_score(created_at, POST_WEIGHT)] for post_id, created_at in posts.items()}
+    for post_id, created_at in Like.objects.filter(like_post_id__in=posts).values_list('like_post_id', 'created_at'):
+        # Inkremental yo'l bilan bir xil bo'lishi uchun layk vaqti bo'lak boshiga yaxlitlanadi
+        scores[post_id].append(event_score(bucket_moment(like_bucket(created_at)), LIKE_WEIGHT))
+    for post_id, created_at in Comment.objects.filter(comment_post_id__in=posts).values_list('comment_post_id', 'created_at'):
+        scores[post_id].append(event_score(created_at, COMMENT_WEIGHT))
+
+    results = {}
+    for post_id, values in scores.items():
+        removed = []
+        for bucket, delta in (pending or {}).get(post_id, {}).items():
+            # Unlike qatorni o'chirgan, flush esa uni ayiradi: qaytarib qo'shiladi
+            target = removed if delta > 0 else values
+            target.append(event_score(bucket_moment(bucket), LIKE_WEIGHT * abs(delta)))
+        total = log_sum(values)
+        if removed:
+            total += math.log(max(1 - math.exp(log_sum(removed) - total), MIN_RATIO))
+        results[post_id] = total
+    return results
+
+
+def rescore(batch_size=1000):
+    from qost import likes
+
+    last_id, total = 0, 0
+    # Rescore davomida flush to'xtatiladi: kutilayotgan o'zgarishlar ballga kirmaydi va
+    # rescore tugagach flush ularni bir marta qo'shadi
+    with likes.flush_lock(wait=True):
+        while True:
+            posts = dict(
+                Post.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'created_at')[:batch_size]
+            )
+            if not posts:
+                return total
+            likes.extend_flush_lock()
+            with transaction.atomic():
+                scores = pending_scores(posts, likes.pending_deltas)
+                Post.objects.filter(id__in=scores).update(trending_score=Case(
+                    *[When(id=post_id, then=Value(score)) for post_id, score in scores.items()],
+                    default=F('trending_score'),
+                    output_field=FloatField()
+                ))
+            last_id = max(posts)
+            total += len(posts)
+
+
+def pending_scores(posts, pending_deltas, attempts=3):
+    # Hisoblash paytida yangi layk kelsa (Like qatori va bufer bir-biriga mos kelmasligi
+    # mumkin) qayta hisoblanadi
+    pending = pending_deltas(posts)
+    for _ in range(attempts):
+        scores = compute(posts, pending)
+        current = pending_deltas(posts)
+        if current == pending:
+            break
+        pending = current
+    return scores
+
+
+def initial_score():
+    return event_score(timezone.now(), POST_WEIGHT)
+
+
+def top(limit):
+    # post_trending_idx indeksidan birinchi limit ta qator
+    return Post.objects.select_related('post_user').prefetch_related('post_xtext').order_by('-trending_score', '-id')[:limit]
@@ -0,0 +1,85 @@
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from users.images import detect_extension
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: fcntl yo'q, msvcrt bilan bitta bayt qulflanadi
+    fcntl = None
+    import msvcrt
+
+CHUNK_SIZE = 64 * 1024
+POST_DIR = 'images/post'
+# msvcrt qulfi majburiy: o'qish/yozishga xalal bermasligi uchun fayl oxiridan uzoqdagi bayt
+LOCK_OFFSET = 2 ** 40
+
+
+def uploads_dir():
+    return Path(settings.MEDIA_ROOT) / 'uploads'
+
+
+def part_path(upload):
+    return uploads_dir() / f'{upload.id}.part'
+
+
+def current_offset(upload):
+    # Qabul qilingan baytlar soni - diskdagi .part fayl hajmi
+    path = part_path(upload)
+    return path.stat().st_size if path.exists() else 0
+
+
+@contextmanager
+def locked_part(upload):
+    # .part fayl yozish davomida qulflanadi: bir upload ga parallel PATCH yoki
+    # yakunlash kelsa BlockingIOError ko'tariladi (view 409 qaytaradi)
+    path = part_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'ab') as target:
+        lock(target)
+        yield target
+
+
+def lock(target):
+    if fcntl is not None:
+        fcntl.flock(target, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return
+    target.seek(LOCK_OFFSET)
+    try:
+        msvcrt.locking(target.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError as error:
+        raise BlockingIOError(*error.args) from error
+    finally:
+        target.seek(0, os.SEEK_END)
+
+
+def part_size(target):
+    return os.fstat(target.fileno()).st_size
+
+
+def append_chunk(target, stream, length):
+    # So'rov tanasi CHUNK_SIZE bo'laklab diskka yoziladi, xotirada to'planmaydi
+    written = 0
+    while written < length:
+        chunk = stream.read(min(CHUNK_SIZE, length - written))
+        if not chunk:
+            break
+        target.write(chunk)
+        written += len(chunk)
+    target.flush()
+    return written
+
+
+def assemble(upload):
+    path = part_path(upload)
+    extension = detect_extension(path)
+    with open(path, 'rb') as source:
+        name = default_storage.save(f'{POST_DIR}/{upload.id}{extension}', File(source))
+    path.unlink()
+    return name
@@ -0,0 +1,19 @@
+from django.urls import path
+from qost.views import FeedView, TimelineView, SearchView, TrendingView, TagPostsView, FollowView, LikeView, CommentListView, CommentDeleteView, CommentThreadView, PostUploadCreateView, PostUploadView, PostUploadCompleteView
+
+
+urlpatterns = [
+    path('feed/', FeedView.as_view(), name='feed'),
+    path('timeline/', TimelineView.as_view(), name='timeline'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('trending/', TrendingView.as_view(), name='trending'),
+    path('tags/<str:tag>/posts/', TagPostsView.as_view(), name='tag-posts'),
+    path('follow/<int:user_id>/', FollowView.as_view(), name='follow'),
+    path('posts/<int:post_id>/like/', LikeView.as_view(), name='like'),
+    path('posts/<int:post_id>/comments/', CommentListView.as_view(), name='comments'),
+    path('comments/<int:pk>/', CommentDeleteView.as_view(), name='comment-delete'),
+    path('comments/<int:pk>/thread/', CommentThreadView.as_view(), name='comment-thread'),
+    path('uploads/', PostUploadCreateView.as_view(), name='upload-create'),
+    path('uploads/<uuid:pk>/', PostUploadView.as_view(), name='upload'),
+    path('uploads/<uuid:pk>/complete/', PostUploadCompleteView.as_view(), name='upload-complete'),
+]
@@ -1,3 +1,282 @@
-from django.shortcuts import render
+from drf_spectacular.utils import extend_schema
+from rest_framework import status, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import CreateAPIView, DestroyAPIView, ListAPIView, ListCreateAPIView, get_object_or_404
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
 
-# Create your views here.
+from qost import likes, threads, timeline, trending
+from qost.models import Comment, Follow, Post, PostUpload, Xtext
+from qost.pagination import KeysetPagination
+from qost.search import get_search_backend
+from qost.tags import normalize_tag
+from qost.serializers import CommentSerializer, PostSerializer, PostUploadSerializer, UploadCompleteSerializer
+from qost.uploads import append_chunk, assemble, locked_part, part_size
+from users.models import User
+
+
+class FeedView(ListCreateAPIView):
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
+
+    def get_queryset(self):
+        # Sahifa hajmidan qat'i nazar 2 ta so'rov: postlar (+muallif) va teglar
+        return Post.objects.select_related('post_user').prefetch_related('post_xtext')
+
+    def perform_create(self, serializer):
+        serializer.save(post_user=self.request.user)
+
+
+class TrendingView(APIView):
+    # Oldindan hisoblangan trending_score bo'yicha top-N (?page_size=)
+    permission_classes = [permissions.IsAuthenticated]
+    pagination = KeysetPagination
+
+    def get(self, request, *args, **kwargs):
+        posts = trending.top(self.pagination().get_page_size(request))
+        return Response({
+            'results': PostSerializer(posts, many=True, context={'request': request}).data
+        })
+
+
+class TagPostsView(ListAPIView):
+    # Teg bo'yicha postlar: keyset through jadvalining o'zida, (xtext_id, post_id DESC)
+    # indeksidan saralashsiz o'qiladi, keyin sahifadagi postlar bitta in_bulk bilan olinadi
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-post',)
+
+    def get_queryset(self):
+        tag = get_object_or_404(Xtext, text=normalize_tag(self.kwargs['tag']))
+        return Post.post_xtext.through.objects.filter(xtext=tag)
+
+    def list(self, request, *args, **kwargs):
+        page = [row.post_id for row in self.paginate_queryset(self.get_queryset())]
+        posts = Post.objects.select_related('post_user').prefetch_related('post_xtext').in_bulk(page)
+        results = [posts[post_id] for post_id in page if post_id in posts]
+        return self.get_paginated_response(self.get_serializer(results, many=True).data)
+
+
+class CommentListView(ListCreateAPIView):
+    serializer_class = CommentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('created_at', 'id')
+
+    def get_queryset(self):
+        # Faqat ildiz izohlar; javoblar CommentThreadView orqali
+        return Comment.objects.filter(
+            comment_post_id=self.kwargs['post_id'],
+            parent__isnull=True
+        ).select_related('comment_user')
+
+    def perform_create(self, serializer):
+        post = get_object_or_404(Post.objects.only('id'), id=self.kwargs['post_id'])
+        parent = serializer.validated_data.get('parent')
+        if parent is not None and parent.comment_post_id != post.id:
+            raise ValidationError({'status': 'Fail', 'message': 'Javob boshqa postdagi izohga berilgan'})
+        serializer.save(comment_user=self.request.user, comment_post=post)
+
+
+class CommentThreadView(APIView):
+    # Izoh va uning javoblari daraxti: bitta diapazon so'rovi + chiziqli yig'ish
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        root = get_object_or_404(Comment.objects.only('id', 'comment_post_id', 'path', 'depth'), id=pk)
+        try:
+            depth = int(request.query_params['depth']) if 'depth' in request.query_params else None
+        except ValueError:
+            raise ValidationError({'status': 'Fail', 'message': 'depth butun son bo\'lishi kerak'})
+        if depth is not None and depth < 0:
+            raise ValidationError({'status': 'Fail', 'message': 'depth manfiy bo\'lmasligi kerak'})
+
+        return Response(threads.build_tree(threads.subtree(root, depth))[0])
+
+
+class CommentDeleteView(DestroyAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Comment.objects.filter(comment_user=self.request.user)
+
+
+class TimelineView(APIView):
+    # Obuna bo'lingan mualliflar lentasi: cache'dan id lar + bitta in_bulk
+    permission_classes = [permissions.IsAuthenticated]
+    pagination = KeysetPagination
+
+    def get(self, request, *args, **kwargs):
+        try:
+            before = int(request.query_params['before']) if 'before' in request.query_params else None
+        except ValueError:
+            raise ValidationError({'status': 'Fail', 'message': 'before butun son bo\'lishi kerak'})
+        limit = self.pagination().get_page_size(request)
+
+        ids = timeline.read(request.user, before, limit + 1)
+        page = ids[:limit]
+        posts = Post.objects.select_related('post_user').prefetch_related('post_xtext').in_bulk(page)
+        results = [posts[post_id] for post_id in page if post_id in posts]
+
+        next_link = None
+        if len(ids) > limit:
+            next_link = replace_query_param(request.build_absolute_uri(), 'before', page[-1])
+        return Response({
+            'next': next_link,
+            'results': PostSerializer(results, many=True, context={'request': request}).data
+        })
+
+
+class SearchView(APIView):
+    # bm25 bo'yicha tartiblangan postlar: ?q=...&page_size=&offset=
+    permission_classes = [permissions.IsAuthenticated]
+    pagination = KeysetPagination
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'status': 'Fail', 'message': 'q parametri kerak'})
+        try:
+            offset = max(0, int(request.query_params.get('offset', 0)))
+        except ValueError:
+            raise ValidationError({'status': 'Fail', 'message': 'offset butun son bo\'lishi kerak'})
+        limit = self.pagination().get_page_size(request)
+
+        ids = get_search_backend().search(query, limit + 1, offset)
+        page = ids[:limit]
+        posts = Post.objects.select_related('post_user').prefetch_related('post_xtext').in_bulk(page)
+        results = [posts[post_id] for post_id in page if post_id in posts]
+
+        next_link = None
+        if len(ids) > limit:
+            next_link = replace_query_param(request.build_absolute_uri(), 'offset', offset + limit)
+        return Response({
+            'next': next_link,
+            'results': PostSerializer(results, many=True, context={'request': request}).data
+        })
+
+
+class FollowView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, user_id, *args, **kwargs):
+        following = get_object_or_404(User, id=user_id)
+        if following.id == request.user.id:
+            raise ValidationError({'status': 'Fail', 'message': 'O\'zingizga obuna bo\'lolmaysiz'})
+        _, created = Follow.objects.get_or_create(follower=request.user, following=following)
+        if created:
+            timeline.invalidate(request.user.id)
+        return Response({'status': 'Success'}, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    def delete(self, request, user_id, *args, **kwargs):
+        deleted, _ = Follow.objects.filter(follower=request.user, following_id=user_id).delete()
+        if deleted:
+            timeline.invalidate(request.user.id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class LikeView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, post_id, *args, **kwargs):
+        post = get_object_or_404(Post.objects.only('id', 'like'), id=post_id)
+        created = likes.like(request.user, post)
+        return Response(
+            {'status': 'Success', 'like': post.like + likes.pending_delta(post.id)},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    def delete(self, request, post_id, *args, **kwargs):
+        post = get_object_or_404(Post.objects.only('id', 'like'), id=post_id)
+        likes.unlike(request.user, post)
+        return Response({'status': 'Success', 'like': post.like + likes.pending_delta(post.id)})
+
+
+class PostUploadCreateView(CreateAPIView):
+    serializer_class = PostUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_create(self, serializer):
+        serializer.save(upload_user=self.request.user)
+
+
+class PostUploadView(APIView):
+    # Tus'ga o'xshash: GET qayerdan davom etishni beradi, PATCH keyingi bo'lakni
+    # `Upload-Offset` sarlavhasi bilan qabul qiladi
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_upload(self, request, pk):
+        return get_object_or_404(PostUpload, id=pk, upload_user=request.user)
+
+    def get(self, request, pk, *args, **kwargs):
+        return Response(PostUploadSerializer(self.get_upload(request, pk)).data)
+
+    def patch(self, request, pk, *args, **kwargs):
+        upload = self.get_upload(request, pk)
+        if upload.status != PostUpload.UPLOADING:
+            return Response({'status': 'Fail', 'message': 'Yuklash allaqachon yakunlangan'}, status=status.HTTP_409_CONFLICT)
+
+        try:
+            client_offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers.get('Content-Length') or 0)
+        except ValueError:
+            raise ValidationError({'status': 'Fail', 'message': 'Upload-Offset sarlavhasi kerak'})
+
+        try:
+            with locked_part(upload) as target:
+                offset = part_size(target)
+                if client_offset != offset:
+                    return Response({'status': 'Fail', 'offset': offset}, status=status.HTTP_409_CONFLICT)
+                if offset + length > upload.size:
+                    raise ValidationError({'status': 'Fail', 'message': 'Bo\'lak fayl hajmidan oshib ketdi'})
+                if length:
+                    append_chunk(target, request.stream, length)
+                offset = part_size(target)
+        except BlockingIOError:
+            return Response(
+                {'status': 'Fail', 'message': 'Bu yuklashga boshqa bo\'lak yozilmoqda'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response({'offset': offset})
+
+
+class PostUploadCompleteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        request=UploadCompleteSerializer
+    )
+    def post(self, request, pk, *args, **kwargs):
+        upload = get_object_or_404(PostUpload, id=pk, upload_user=request.user, status=PostUpload.UPLOADING)
+        serializer = UploadCompleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        post = get_object_or_404(Post, id=serializer.validated_data['post'], post_user=request.user)
+
+        try:
+            with locked_part(upload) as target:
+                if part_size(target) != upload.size:
+                    raise ValidationError({'status': 'Fail', 'message': 'Fayl to\'liq yuklanmagan'})
+                name = assemble(upload)
+        except BlockingIOError:
+            return Response(
+                {'status': 'Fail', 'message': 'Bu yuklashga boshqa bo\'lak yozilmoqda'},
+                status=status.HTTP_409_CONFLICT
+            )
+        except (OSError, SyntaxError, ValueError):
+            raise ValidationError({'status': 'Fail', 'message': 'Rasm fayli buzilgan'})
+
+        post.post_image.name = name
+        post.renditions = {}
+        post.renditions_ready = False
+        post.save()
+        upload.status = PostUpload.COMPLETE
+        upload.upload_post = post
+        upload.save()
+        return Response({
+            'status': 'Success',
+            'post_image': post.post_image.url
+        })
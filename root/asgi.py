@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+users.async_views dagi endpointlar shu yerda event loop ichida ishlaydi.
+Har bir yadro uchun bitta worker (bitta event loop) ishga tushiring, masalan:
+
+    uvicorn root.asgi:application --workers $(nproc)
 """
 
 import os
@@ -12,5 +17,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'root.settings')
+# root.settings: ASGI da doimiy baza ulanishlari o'chiriladi
+os.environ.setdefault('DJANGO_SERVER', 'asgi')
 
 application = get_asgi_application()
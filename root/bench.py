@@ -0,0 +1,149 @@
+import asyncio
+import json
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from root.caches import is_shared
+from users.authentication import user_cache
+
+# bench_* buyruqlari uchun umumiy qism: vaqtinchalik baza, persentillar va so'rovlar sanog'i
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def latency_stats(latencies_ms):
+    return {
+        'n': len(latencies_ms),
+        'p50_ms': round(percentile(latencies_ms, 50), 3),
+        'p99_ms': round(percentile(latencies_ms, 99), 3),
+        'mean_ms': round(statistics.mean(latencies_ms), 3),
+    }
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def run_threads(concurrency, iterations, request):
+    # concurrency ta thread (WSGI worker thread'lari kabi), har biri iterations marta request(worker, i)
+    latencies, errors = [], []
+
+    def worker(number):
+        try:
+            for iteration in range(iterations):
+                latencies.append(timed(request, number, iteration))
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return latencies, time.perf_counter() - started
+
+
+def run_tasks(concurrency, iterations, request):
+    # Bitta event loop da concurrency ta korutina; request - async funksiya
+    latencies = []
+
+    async def worker(number):
+        for iteration in range(iterations):
+            started = time.perf_counter()
+            result = await request(number, iteration)
+            latencies.append((result, (time.perf_counter() - started) * 1000))
+
+    async def main():
+        await asyncio.gather(*(worker(number) for number in range(concurrency)))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return latencies, time.perf_counter() - started
+
+
+@contextmanager
+def count_queries():
+    queries = []
+
+    def count(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        yield queries
+
+
+@contextmanager
+def bench_database():
+    # Throttle'lar o'chiriladi, baza - diskdagi vaqtinchalik fayl (ishchi baza tegilmaydi).
+    # LocMem ning MAX_ENTRIES=300 i o'lchov o'rtasida kalitlarni siqib chiqarmasligi uchun kattalashtiriladi
+    rest_framework = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+    caches = settings.CACHES
+    if not is_shared():
+        caches = {**caches, 'default': {**caches['default'], 'OPTIONS': {'MAX_ENTRIES': 10 ** 7}}}
+    with tempfile.TemporaryDirectory() as directory, override_settings(REST_FRAMEWORK=rest_framework, CACHES=caches):
+        setup_test_environment()
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        test_settings['NAME'] = str(Path(directory) / 'bench.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        cache.clear()
+        user_cache.clear()
+        try:
+            yield Path(directory)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+
+class BenchCommand(BaseCommand):
+    # measure() {qator: {ustun: qiymat}} qaytaradi, jadval va --json shu yerda
+    iterations = 1000
+    uses_database = True
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=self.iterations)
+        parser.add_argument('--json', dest='json_path', help='Natijalarni JSON faylga yozish')
+
+    def handle(self, *args, **options):
+        if self.uses_database:
+            with bench_database():
+                results = self.measure(options)
+        else:
+            results = self.measure(options)
+        self.report(results)
+        if options['json_path']:
+            Path(options['json_path']).write_text(json.dumps(results, indent=2))
+
+    def measure(self, options):
+        raise NotImplementedError
+
+    def report(self, results):
+        columns = list(dict.fromkeys(column for row in results.values() for column in row))
+        width = max(len(name) for name in results) + 2
+        widths = [max(10, len(column)) + 2 for column in columns]
+        self.stdout.write(f"{'':<{width}}" + ''.join(f'{column:>{size}}' for column, size in zip(columns, widths)))
+        for name, row in results.items():
+            self.stdout.write(f'{name:<{width}}' + ''.join(
+                f"{row.get(column, ''):>{size}}" for column, size in zip(columns, widths)
+            ))
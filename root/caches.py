@@ -0,0 +1,11 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# LocMem va Dummy jarayon ichida ishlaydi: boshqa workerlar va management
+# buyruqlari bir-birining yozuvlarini ko'rmaydi
+LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared(alias='default'):
+    return not isinstance(caches[alias], LOCAL_BACKENDS)
@@ -0,0 +1,61 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# O'qishlar replica'ga faqat ReplicaRoutingMiddleware ruxsat bergan so'rovlarda
+# (settings.DATABASE_REPLICA_VIEWS dagi GET endpointlar) yuboriladi. So'rov
+# biror narsa yozgan zahoti oxirigacha primary ga bog'lanadi, javobga esa cookie
+# qo'yiladi: replikatsiya kechikishi paytida foydalanuvchi o'z yozuvini ko'radi.
+PRIMARY = 'default'
+PIN_COOKIE = 'db_primary'
+
+replica_reads = ContextVar('replica_reads', default=False)
+pinned = ContextVar('pinned', default=False)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != PRIMARY]
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if not replica_reads.get() or pinned.get() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        aliases = replica_aliases()
+        return random.choice(aliases) if aliases else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        pinned.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replica'lar primary ning nusxasi, obyektlar o'rtasida farq yo'q
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+class ReplicaRoutingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned_token = pinned.set(PIN_COOKIE in request.COOKIES)
+        reads_token = replica_reads.set(False)
+        try:
+            response = self.get_response(request)
+            if pinned.get() and PIN_COOKIE not in request.COOKIES:
+                response.set_cookie(PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_PIN_SECONDS, httponly=True)
+            return response
+        finally:
+            pinned.reset(pinned_token)
+            replica_reads.reset(reads_token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in ('GET', 'HEAD') and request.resolver_match.url_name in settings.DATABASE_REPLICA_VIEWS:
+            replica_reads.set(True)
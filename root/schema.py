@@ -0,0 +1,98 @@
+import gzip
+import hashlib
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.views import View
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.renderers import OpenApiYamlRenderer
+
+# OpenAPI sxemasi har so'rovda qayta qurilmaydi: deploy paytida
+# `manage.py spectacular --file openapi.yaml` bilan yoziladi (SPECTACULAR_SCHEMA_FILE),
+# fayl bo'lmasa birinchi so'rovda bir marta generatsiya qilinadi. Javob xotiradan,
+# kuchli ETag va oldindan siqilgan gzip bilan beriladi.
+CONTENT_TYPES = {
+    '.json': 'application/vnd.oai.openapi+json',
+    '.yaml': 'application/vnd.oai.openapi',
+    '.yml': 'application/vnd.oai.openapi',
+}
+
+
+class CachedSchema:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded = False
+
+    def load(self):
+        path = Path(getattr(settings, 'SPECTACULAR_SCHEMA_FILE', ''))
+        if path.name and path.is_file():
+            content = path.read_bytes()
+            content_type = CONTENT_TYPES.get(path.suffix, 'application/vnd.oai.openapi')
+        else:
+            schema = SchemaGenerator().get_schema(request=None, public=True)
+            content = OpenApiYamlRenderer().render(schema, renderer_context={})
+            content_type = 'application/vnd.oai.openapi'
+
+        self.content = content
+        self.gzipped = gzip.compress(content, compresslevel=9, mtime=0)
+        self.content_type = f'{content_type}; charset=utf-8'
+        digest = hashlib.sha256(content).hexdigest()
+        # Siqilgan va siqilmagan javob baytlari har xil, kuchli ETag ham har xil bo'ladi
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+        self.loaded = True
+
+    def get(self):
+        if not self.loaded:
+            with self.lock:
+                if not self.loaded:
+                    self.load()
+        return self
+
+
+cached_schema = CachedSchema()
+
+
+def accepts_gzip(header):
+    # RFC 9110: `gzip;q=0` rad etish degani; gzip aytilmagan bo'lsa `*` ning q si olinadi
+    qualities = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities.get('gzip', qualities.get('x-gzip', qualities.get('*', 0.0))) > 0
+
+
+class SchemaView(View):
+
+    def get(self, request, *args, **kwargs):
+        schema = cached_schema.get()
+        compressed = accepts_gzip(request.headers.get('Accept-Encoding', ''))
+        etag = schema.gzip_etag if compressed else schema.etag
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        elif compressed:
+            response = HttpResponse(schema.gzipped, content_type=schema.content_type)
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(schema.content, content_type=schema.content_type)
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -53,6 +54,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'root.routers.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -86,13 +88,53 @@ WSGI_APPLICATION = 'root.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# WAL: o'quvchilar yozuvchini kutmaydi; synchronous=NORMAL WAL da xavfsiz,
+# mmap va cache_size (KiB, manfiy) o'qishlarni xotiradan beradi.
+SQLITE_PRAGMAS = 'PRAGMA synchronous=NORMAL; PRAGMA mmap_size=268435456; PRAGMA cache_size=-65536'
+
+# Doimiy ulanishlar faqat WSGI da: ASGI (root.asgi) da Django CONN_MAX_AGE=0 ni tavsiya qiladi,
+# async view lar har so'rovni boshqa thread'da bajaradi va ulanishlar yopilmay qoladi
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', 0 if os.environ.get('DJANGO_SERVER') == 'asgi' else 600))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': f'PRAGMA journal_mode=WAL; {SQLITE_PRAGMAS}',
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
+# Replica (root.routers): lokal sinov uchun primary ning nusxasi, masalan
+# `sqlite3 db.sqlite3 ".backup replica.sqlite3"` va DATABASE_REPLICA_PATH=replica.sqlite3
+if os.environ.get('DATABASE_REPLICA_PATH'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f"file:{os.environ['DATABASE_REPLICA_PATH']}?mode=ro",
+        'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'uri': True,
+            'init_command': SQLITE_PRAGMAS,
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+
+DATABASE_ROUTERS = ['root.routers.PrimaryReplicaRouter']
+# Replica'dan o'qiydigan GET endpointlar (url name)
+DATABASE_REPLICA_VIEWS = [
+    'feed', 'timeline', 'search', 'trending', 'tag-posts', 'comments', 'comment-thread',
+]
+# Yozgan foydalanuvchi shuncha soniya primary dan o'qiydi
+DATABASE_REPLICA_PIN_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -112,6 +154,10 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+AUTHENTICATION_BACKENDS = [
+    'users.backends.ContactBackend',
+]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -130,6 +176,44 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Ishlab chiqarishda barcha workerlar uchun umumiy backend (Redis, Memcached) qo'ying
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Umumiy cache (redis paketi kerak): REDIS_URL=redis://127.0.0.1:6379/0
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
+# users.code_store: None - umumiy cache bo'lsa CacheCodeStore, aks holda DatabaseCodeStore
+VERIFICATION_CODE_STORE = None
+
+# users.hashing: parol xeshlash uchun thread soni va navbat chegarasi (oshsa 503)
+PASSWORD_HASHING_WORKERS = 4
+PASSWORD_HASHING_QUEUE = 64
+
+# qost.likes: layklarni cache'da yig'ib flush_likes bilan yozish. None - faqat umumiy
+# cache backendda (root.caches.is_shared) yoqiladi, LocMem da har layk darhol yoziladi
+QOST_LIKE_BUFFER = None
+
+# qost.timeline: obunachilar lentasiga yozish fan_out_timelines worker ida. None - faqat
+# umumiy cache backendda, LocMem da post commit bo'lgach shu jarayonda yoziladi
+QOST_TIMELINE_WORKER = None
+
+# qost.search: qidiruv dvigateli (SQLite da FTS5 virtual jadvali)
+QOST_SEARCH_BACKEND = 'qost.search.SQLiteFTSBackend'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -139,8 +223,29 @@ REST_FRAMEWORK = {
     # YOUR SETTINGS
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'users.authentication.CachedJWTAuthentication',
+    ),
+    # users.throttling: sirpanuvchi oyna chegaralari
+    'DEFAULT_THROTTLE_RATES': {
+        'login': '600/min',
+        'login_ip': '20/min',
+        'login_contact': '5/min',
+        'new_code': '3/min',
+        'confirmation': '10/min',
+    },
+}
+
+# users.blacklist: qora ro'yxat Bloom filtrining boshlang'ich sig'imi va xato ehtimoli
+TOKEN_BLACKLIST_CAPACITY = 100000
+TOKEN_BLACKLIST_ERROR_RATE = 0.01
+
+# users.authentication: JWT dagi foydalanuvchilar uchun LRU/TTL cache. SHARED None -
+# faqat umumiy cache backendda (root.caches.is_shared) workerlararo invalidatsiya;
+# LocMem da bloklash darhol faqat shu jarayonda kuchga kiradi, bir nechta worker uchun REDIS_URL kerak
+AUTH_USER_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+    'SHARED': None,
 }
 
 SPECTACULAR_SETTINGS = {
@@ -151,11 +256,14 @@ SPECTACULAR_SETTINGS = {
     # OTHER SETTINGS
 }
 
+# root.schema: deploy paytida `python manage.py spectacular --file openapi.yaml`
+SPECTACULAR_SCHEMA_FILE = BASE_DIR / 'openapi.yaml'
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=2),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=30),
-    "ROTATE_REFRESH_TOKENS": False,
-    "BLACKLIST_AFTER_ROTATION": False,
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
     "UPDATE_LAST_LOGIN": False,
 
     "ALGORITHM": "HS256",
@@ -0,0 +1,102 @@
+import gzip
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.db import connection, connections
+from django.test import SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+
+from rest_framework.test import APIClient
+
+from qost.models import Post
+from root import routers
+from root.schema import accepts_gzip, cached_schema
+from users.models import User
+
+
+class SchemaEncodingTests(SimpleTestCase):
+
+    def test_q_values(self):
+        self.assertTrue(accepts_gzip('gzip, deflate, br'))
+        self.assertTrue(accepts_gzip('br;q=1.0, gzip;q=0.5'))
+        self.assertTrue(accepts_gzip('*'))
+        self.assertFalse(accepts_gzip(''))
+        self.assertFalse(accepts_gzip('gzip;q=0'))
+        self.assertFalse(accepts_gzip('GZIP; Q=0.000, br'))
+        self.assertFalse(accepts_gzip('*;q=1, gzip;q=0'))
+        self.assertFalse(accepts_gzip('identity, *;q=0'))
+
+    def test_refused_gzip_gets_plain_body(self):
+        schema = cached_schema.get()
+        response = self.client.get(reverse('schema'), HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(response.content, schema.content)
+        self.assertEqual(response['ETag'], schema.etag)
+
+        response = self.client.get(reverse('schema'), HTTP_ACCEPT_ENCODING='gzip;q=0.8')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), schema.content)
+        self.assertEqual(response['ETag'], schema.gzip_etag)
+
+    def test_schema_declares_jwt_security(self):
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+        self.assertIn('jwtAuth', schema['components']['securitySchemes'])
+        operation = schema['paths'][reverse('feed')]['get']
+        self.assertIn({'jwtAuth': []}, operation['security'])
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    # Replica - primary ning ikkinchi SQLite fayldagi nusxasi; keyin primary ga yozilgan
+    # post replikatsiya kechikishini taqlid qiladi
+
+    def setUp(self):
+        self.author = User.objects.create(username='routed', email='routed@example.com')
+        self.old = Post.objects.create(post_user=self.author, title='old', content='old')
+        self.old.post_xtext.create(text='routed')
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'replica.sqlite3'
+        connection.ensure_connection()
+        with sqlite3.connect(path) as target:
+            connection.connection.backup(target)
+        target.close()
+        connections.settings['replica'] = {**connection.settings_dict, 'NAME': str(path), 'TEST': {}}
+        self.addCleanup(self.drop_replica)
+        # Alias test boshlangandan keyin qo'shiladi, Django uni ruxsat etilganlarga o'zi qo'shmaydi
+        self.enterContext(mock.patch.object(type(self), 'databases', {'default', 'replica'}))
+        self.enterContext(mock.patch.object(routers, 'replica_aliases', lambda: ['replica']))
+
+        self.new = Post.objects.create(post_user=self.author, title='new', content='new')
+        self.new.post_xtext.add(self.old.post_xtext.get())
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    @staticmethod
+    def drop_replica():
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+
+    def titles(self, name, *args, **params):
+        response = self.client.get(reverse(name, args=args), params)
+        self.assertEqual(response.status_code, 200)
+        return [post['title'] for post in response.data['results']]
+
+    def test_listed_reads_go_to_replica(self):
+        self.assertEqual(self.titles('feed'), ['old'])
+        self.assertEqual(self.titles('tag-posts', 'routed'), ['old'])
+        self.assertEqual(self.titles('search', q='routed'), ['old'])
+
+    def test_write_pins_request_to_primary(self):
+        self.assertEqual(self.titles('feed'), ['old'])
+        response = self.client.post(reverse('like', args=[self.old.id]))
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+        self.assertEqual(self.titles('feed'), ['new', 'old'])
+
+        self.client.cookies.clear()
+        self.assertEqual(self.titles('feed'), ['old'])
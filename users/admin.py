@@ -1,9 +1,10 @@
 from django.contrib import admin
 
-from users.models import User, UserConfirmation
+from users.models import User, UserConfirmation, EmailOutbox
 
 # Register your models here.
 
 
 admin.site.register(User)
-admin.site.register(UserConfirmation)
\ No newline at end of file
+admin.site.register(UserConfirmation)
+admin.site.register(EmailOutbox)
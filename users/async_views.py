@@ -0,0 +1,213 @@
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, ParseError, Throttled, ValidationError
+from rest_framework.settings import api_settings
+
+from users.authentication import CachedJWTAuthentication
+from users.backends import ContactBackend
+from users.code_store import get_code_store
+from users.hashing import hashing_executor
+from users.models import User, NEW, VERIFICATION_CODE, VIA_EMAIL, VIA_PHONE
+from users.serializers import UserSerializer, ConfSerializer, UserChangeSerializer
+from users.throttling import LOGIN_THROTTLES, ConfirmationThrottle, NewCodeThrottle
+from users.utility import asend_email_cod
+
+# ASGI (root/asgi.py) ostida ishlaydigan async endpointlar: ORM uchun
+# aget/aexists/aupdate/acreate, parol xeshlash esa hashing_executor da.
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAPIView(View):
+    authentication_required = False
+    throttle_classes = []
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.data = self.parse_body(request)
+            if self.authentication_required:
+                request.user = await self.authenticate(request)
+            await self.check_throttles(request)
+            return await super(AsyncAPIView, self).dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            response = JsonResponse(detail, status=exc.status_code, safe=False)
+            if getattr(exc, 'wait', None):
+                response['Retry-After'] = str(math.ceil(exc.wait))
+            return response
+
+    async def check_throttles(self, request):
+        # Birinchi rad etgan throttle'da to'xtaladi: keyingilari (masalan umumiy login chegarasi) sanalmaydi
+        for throttle in (cls() for cls in self.throttle_classes):
+            if not await throttle.aallow_request(request, self):
+                raise Throttled(throttle.wait())
+
+    @staticmethod
+    def parse_body(request):
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                raise ParseError()
+            if not isinstance(data, dict):
+                raise ParseError('JSON obyekt kutilgan')
+            return data
+        return request.POST
+
+    @staticmethod
+    async def authenticate(request):
+        result = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+        if result is None:
+            raise NotAuthenticated()
+        return result[0]
+
+
+class AsyncUserSignUpView(AsyncAPIView):
+    async def post(self, request, *args, **kwargs):
+        email_or_phone = request.data.get('email_or_phone')
+        if email_or_phone is not None:
+            try:
+                email_or_phone = await UserSerializer.avalidate_email_or_phone(str(email_or_phone))
+            except ValidationError as exc:
+                return JsonResponse({'email_or_phone': exc.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            data = UserSerializer.auth_validate({'email_or_phone': email_or_phone})
+        except ValidationError as exc:
+            detail = exc.detail if isinstance(exc.detail, dict) else {api_settings.NON_FIELD_ERRORS_KEY: exc.detail}
+            return JsonResponse(detail, status=status.HTTP_400_BAD_REQUEST)
+
+        user = await User.objects.acreate(**data)
+        if user.auth_type == VIA_PHONE:
+            await user.acreate_verification_code(VIA_PHONE)
+        elif user.auth_type == VIA_EMAIL:
+            code = await user.acreate_verification_code(VIA_EMAIL)
+            await asend_email_cod(user.email, code)
+
+        await sync_to_async(user.token)()
+        return JsonResponse(UserSerializer(user).data, status=status.HTTP_201_CREATED)
+
+
+class AsyncUserConfirmationView(AsyncAPIView):
+    authentication_required = True
+    throttle_classes = [ConfirmationThrottle]
+
+    async def post(self, request, *args, **kwargs):
+        user = request.user
+        serializer = ConfSerializer(data=request.data)
+        if not serializer.is_valid():
+            return JsonResponse({
+                'status': 'Fail',
+                'message': serializer.errors
+            })
+
+        if not await get_code_store().averify(user, serializer.validated_data['code']):
+            raise ValidationError({
+                'status': 'Fail',
+                'message': 'Code xato yokida eskirgan'
+            })
+        if user.auth_stats == NEW:
+            user.auth_stats = VERIFICATION_CODE
+            await user.asave()
+
+        token = await sync_to_async(user.token)()
+        return JsonResponse({
+            'status': 'Success',
+            'message': f'Confirmation code {serializer.validated_data["code"]}',
+            'access_token': token['access_token'],
+            'refresh_token': token['refresh_token']
+        })
+
+
+class AsyncNewCodeView(AsyncAPIView):
+    authentication_required = True
+    throttle_classes = [NewCodeThrottle]
+
+    async def get(self, request, *args, **kwargs):
+        user = request.user
+        if await get_code_store().ahas_pending(user):
+            raise ValidationError({
+                'message': 'Code xali yaroqli'
+            })
+
+        if user.auth_type == VIA_PHONE:
+            await user.acreate_verification_code(VIA_PHONE)
+        elif user.auth_type == VIA_EMAIL:
+            code = await user.acreate_verification_code(VIA_EMAIL)
+            await asend_email_cod(user.email, code)
+        else:
+            raise ValidationError({
+                'status': 'Fail',
+                'message': 'Auth type not found'
+            })
+        return JsonResponse({
+            'status': 'Success',
+            'message': 'Code yuborildi'
+        })
+
+
+class AsyncUserLoginView(AsyncAPIView):
+    throttle_classes = LOGIN_THROTTLES
+
+    async def post(self, request, *args, **kwargs):
+        username = request.data.get('username')
+        password = request.data.get('password')
+        errors = {
+            name: ['This field is required.']
+            for name, value in (('username', username), ('password', password)) if not value
+        }
+        if errors:
+            return JsonResponse(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user = await ContactBackend().aget_user_by_login(username)
+        if user is None:
+            # Foydalanuvchi bor-yo'qligini javob vaqtidan bilib bo'lmasligi uchun
+            await hashing_executor.run(make_password, password)
+            valid = False
+        else:
+            valid = await hashing_executor.run(user.check_password, password) and user.is_active
+        if not valid:
+            return JsonResponse(
+                {api_settings.NON_FIELD_ERRORS_KEY: ["Username yoki parol noto'g'ri!"]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        token = await sync_to_async(user.token)()
+        return JsonResponse({
+            'access_token': token['access_token'],
+            'refresh_token': token['refresh_token']
+        }, status=status.HTTP_200_OK)
+
+
+class AsyncUserChangeView(AsyncAPIView):
+    authentication_required = True
+
+    async def put(self, request, *args, **kwargs):
+        return await self.update(request, partial=False)
+
+    async def patch(self, request, *args, **kwargs):
+        return await self.update(request, partial=True)
+
+    async def update(self, request, partial):
+        user = request.user
+        serializer = UserChangeSerializer(user, data=request.data, partial=partial)
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        extra = {}
+        if serializer.validated_data.get('password'):
+            extra['password_hash'] = await hashing_executor.run(make_password, serializer.validated_data['password'])
+        await sync_to_async(serializer.save)(**extra)
+
+        return JsonResponse({
+            'status': 'Success',
+            'message': 'User updated successfully',
+            'user_stats': user.auth_stats
+        })
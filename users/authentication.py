@@ -0,0 +1,122 @@
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from root.caches import is_shared
+from users.models import User
+
+
+class UserCache:
+    # Jarayon ichidagi LRU + TTL. Umumiy cache'da (SHARED) har bir foydalanuvchi uchun
+    # kichik versiya belgisi (token) va alohida kalitda (token, user) nusxasi turadi:
+    # lokal nusxa faqat versiya bilan solishtiriladi, User o'zgarganda (users.signals)
+    # versiya o'chiriladi va boshqa workerlardagi lokal nusxalar ham eskiradi.
+    key_prefix = 'auth-user'
+
+    def __init__(self, max_size=10000, ttl=60, shared=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        # None - faqat umumiy cache backendda (root.caches.is_shared)
+        self.shared_setting = shared
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return is_shared() if self.shared_setting is None else self.shared_setting
+
+    def key(self, user_id):
+        return f'{self.key_prefix}:{user_id}'
+
+    def data_key(self, user_id):
+        return f'{self.key_prefix}-data:{user_id}'
+
+    def get(self, user_id):
+        now = time.monotonic()
+        shared = self.shared
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None:
+                self.entries.move_to_end(user_id)
+
+        if entry is not None and entry[0] > now:
+            if not shared or cache.get(self.key(user_id)) == entry[1]:
+                return copy.copy(entry[2])
+
+        user = None
+        if shared:
+            values = cache.get_many([self.key(user_id), self.data_key(user_id)])
+            token, data = values.get(self.key(user_id)), values.get(self.data_key(user_id))
+            if token is not None and data is not None and data[0] == token:
+                user = data[1]
+        if user is None:
+            # Replica kechikishi invalidatsiyadan keyin eski qatorni qayta cache'lamasligi uchun primary dan
+            user = User.objects.db_manager('default').get(**{api_settings.USER_ID_FIELD: user_id})
+            token = uuid.uuid4().hex
+            if shared:
+                cache.set_many({self.key(user_id): token, self.data_key(user_id): (token, user)}, self.ttl)
+        self.remember(user_id, token, user, now)
+        return copy.copy(user)
+
+    def remember(self, user_id, token, user, now):
+        with self.lock:
+            self.entries[user_id] = (now + self.ttl, token, user)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+        if self.shared:
+            cache.delete_many([self.key(user_id), self.data_key(user_id)])
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache(**{
+    key.lower(): value for key, value in getattr(settings, 'AUTH_USER_CACHE', {}).items()
+})
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    # JWTAuthentication bilan bir xil tekshiruvlar, lekin User har so'rovda SELECT qilinmaydi;
+    # view ga cache'dagi obyektning nusxasi beriladi
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        try:
+            user = user_cache.get(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    # drf-spectacular kengaytmasi faqat aniq JWTAuthentication klassiga mos keladi
+    target_class = 'users.authentication.CachedJWTAuthentication'
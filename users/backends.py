@@ -0,0 +1,46 @@
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from users.models import User
+from users.utility import normalize_contact
+
+
+class ContactBackend(ModelBackend):
+    # username, email yoki telefon raqam bilan kirish - bitta indeksli so'rov
+
+    @staticmethod
+    def login_query(login):
+        query = Q(username=login)
+        try:
+            kind, value = normalize_contact(login)
+        except ValidationError:
+            return query
+        return query | Q(**{kind: value})
+
+    @staticmethod
+    def pick_user(users, login):
+        for user in users:
+            if user.username == login:
+                return user
+        return users[0] if users else None
+
+    def get_user_by_login(self, login):
+        return self.pick_user(list(User.objects.filter(self.login_query(login))[:2]), login)
+
+    async def aget_user_by_login(self, login):
+        return self.pick_user([user async for user in User.objects.filter(self.login_query(login))[:2]], login)
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = self.get_user_by_login(username)
+        if user is None:
+            # Foydalanuvchi bor-yo'qligini javob vaqtidan bilib bo'lmasligi uchun
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,136 @@
+import hashlib
+import math
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+# Refresh token qora ro'yxatda ekanini tekshirish avval jarayon ichidagi Bloom
+# filtrda bo'ladi: "yo'q" javobi aniq, bazaga faqat "bo'lishi mumkin" da boriladi.
+# Filtr BlacklistedToken.id bo'yicha inkremental to'ldiriladi; boshqa workerlar
+# yangi yozuvlarni umumiy cache'dagi VERSION_KEY o'zgarganidan bilishadi.
+# flush_tokens eski yozuvlarni o'chirgach GENERATION_KEY ni oshiradi va filtr noldan quriladi.
+VERSION_KEY = 'token-blacklist-version'
+GENERATION_KEY = 'token-blacklist-generation'
+
+
+class BloomFilter:
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1000)
+        self.size = int(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.capacity = capacity
+        self.count = 0
+
+    def positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(value))
+
+
+class TokenBlacklist:
+
+    def __init__(self, capacity=None, error_rate=None, batch_size=10000):
+        self.capacity = capacity or getattr(settings, 'TOKEN_BLACKLIST_CAPACITY', 100000)
+        self.error_rate = error_rate or getattr(settings, 'TOKEN_BLACKLIST_ERROR_RATE', 0.01)
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.filter = None
+        self.last_id = 0
+        self.version = None
+        self.generation = None
+
+    def sync(self):
+        version, generation = self.shared_state()
+        if self.filter is not None and version == self.version and generation == self.generation:
+            return
+        with self.lock:
+            if self.filter is None or generation != self.generation:
+                self.rebuild()
+            self.load()
+            if self.filter.count > self.filter.capacity:
+                # To'lib qolgan filtrda xato ehtimoli oshadi, kattaroq qilib qayta quriladi
+                self.rebuild()
+                self.load()
+            self.version, self.generation = version, generation
+
+    def rebuild(self):
+        total = BlacklistedToken.objects.count()
+        self.filter = BloomFilter(max(self.capacity, total * 2), self.error_rate)
+        self.last_id = 0
+
+    def load(self):
+        while True:
+            rows = list(
+                BlacklistedToken.objects.filter(id__gt=self.last_id).order_by('id')
+                .values_list('id', 'token__jti')[:self.batch_size]
+            )
+            for _, jti in rows:
+                self.filter.add(jti)
+            if len(rows) < self.batch_size:
+                if rows:
+                    self.last_id = rows[-1][0]
+                return
+            self.last_id = rows[-1][0]
+
+    @staticmethod
+    def shared_state():
+        state = cache.get_many([VERSION_KEY, GENERATION_KEY])
+        return state.get(VERSION_KEY, 0), state.get(GENERATION_KEY, 0)
+
+    @staticmethod
+    def bump(key):
+        cache.add(key, 0, None)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+            return 1
+
+    def is_blacklisted(self, jti):
+        self.sync()
+        if jti not in self.filter:
+            return False
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def blacklist(self, payload, raw_token, user_id):
+        # True - shu chaqiruv qora ro'yxatga qo'shdi; False - token avval qo'shilgan
+        # (bir xil refresh token bilan parallel so'rovlardan faqat bittasi o'tadi)
+        jti = payload[api_settings.JTI_CLAIM]
+        try:
+            with transaction.atomic():
+                token, _ = OutstandingToken.objects.get_or_create(jti=jti, defaults={
+                    'user_id': user_id,
+                    'token': raw_token,
+                    'expires_at': datetime_from_epoch(payload['exp'])
+                })
+                BlacklistedToken.objects.create(token=token)
+        except IntegrityError:
+            return False
+
+        version = self.bump(VERSION_KEY)
+        with self.lock:
+            if self.filter is not None:
+                self.filter.add(jti)
+                # Oraliqda boshqa worker yozmagan bo'lsa, o'z yozuvimiz uchun qayta o'qish shart emas
+                if self.version is not None and version == self.version + 1:
+                    self.version = version
+        return True
+
+
+token_blacklist = TokenBlacklist()
@@ -0,0 +1,128 @@
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from root.caches import is_shared
+from users.models import UserConfirmation
+
+
+class DatabaseCodeStore:
+    # Kodlar faqat UserConfirmation jadvalida saqlanadi
+
+    def create(self, user, verification_type, code):
+        return UserConfirmation.objects.create(
+            code=code,
+            user_id=user.id,
+            verification_type=verification_type
+        )
+
+    def verify(self, user, code):
+        confirmed = user.code.filter(
+            code=code,
+            is_confirmed=False,
+            expire_time__gte=datetime.datetime.now()
+        ).update(is_confirmed=True)
+        return bool(confirmed)
+
+    def has_pending(self, user):
+        return user.code.filter(
+            is_confirmed=False,
+            expire_time__gte=datetime.datetime.now()
+        ).exists()
+
+    async def acreate(self, user, verification_type, code):
+        return await UserConfirmation.objects.acreate(
+            code=code,
+            user_id=user.id,
+            verification_type=verification_type
+        )
+
+    async def averify(self, user, code):
+        confirmed = await user.code.filter(
+            code=code,
+            is_confirmed=False,
+            expire_time__gte=datetime.datetime.now()
+        ).aupdate(is_confirmed=True)
+        return bool(confirmed)
+
+    async def ahas_pending(self, user):
+        return await user.code.filter(
+            is_confirmed=False,
+            expire_time__gte=datetime.datetime.now()
+        ).aexists()
+
+
+class CacheCodeStore(DatabaseCodeStore):
+    # Kutilayotgan kod cache'da expire_time bilan bir xil TTL da turadi. Asosiy manba
+    # baribir UserConfirmation: cache'da topilmasa (boshqa worker, evict) bazadan tekshiriladi.
+    # Cache'dagi eng oxirgi kodga mos kelmagan kod bazaga bormasdan rad etiladi.
+    key_prefix = 'verification-code'
+
+    def key(self, user):
+        return f'{self.key_prefix}:{user.id}'
+
+    def create(self, user, verification_type, code):
+        confirmation = super(CacheCodeStore, self).create(user, verification_type, code)
+        value, timeout = self.remember(confirmation)
+        cache.set(self.key(user), value, timeout=timeout)
+        return confirmation
+
+    def verify(self, user, code):
+        pending = cache.get(self.key(user))
+        if pending is None:
+            confirmed = super(CacheCodeStore, self).verify(user, code)
+        elif pending['code'] != str(code):
+            return False
+        else:
+            confirmed = UserConfirmation.objects.filter(
+                id=pending['id'],
+                is_confirmed=False,
+                expire_time__gte=datetime.datetime.now()
+            ).update(is_confirmed=True)
+        if confirmed:
+            cache.delete(self.key(user))
+        return bool(confirmed)
+
+    def has_pending(self, user):
+        return cache.get(self.key(user)) is not None or super(CacheCodeStore, self).has_pending(user)
+
+    def remember(self, confirmation):
+        timeout = (confirmation.expire_time - datetime.datetime.now()).total_seconds()
+        return {'id': confirmation.id, 'code': str(confirmation.code)}, max(int(timeout), 1)
+
+    async def acreate(self, user, verification_type, code):
+        confirmation = await super(CacheCodeStore, self).acreate(user, verification_type, code)
+        value, timeout = self.remember(confirmation)
+        await cache.aset(self.key(user), value, timeout=timeout)
+        return confirmation
+
+    async def averify(self, user, code):
+        pending = await cache.aget(self.key(user))
+        if pending is None:
+            confirmed = await super(CacheCodeStore, self).averify(user, code)
+        elif pending['code'] != str(code):
+            return False
+        else:
+            confirmed = await UserConfirmation.objects.filter(
+                id=pending['id'],
+                is_confirmed=False,
+                expire_time__gte=datetime.datetime.now()
+            ).aupdate(is_confirmed=True)
+        if confirmed:
+            await cache.adelete(self.key(user))
+        return bool(confirmed)
+
+    async def ahas_pending(self, user):
+        if await cache.aget(self.key(user)) is not None:
+            return True
+        return await super(CacheCodeStore, self).ahas_pending(user)
+
+
+def get_code_store():
+    path = getattr(settings, 'VERIFICATION_CODE_STORE', None)
+    if path is None:
+        # Jarayon ichidagi cache (LocMem) workerlar orasida bo'linmaydi
+        return CacheCodeStore() if is_shared() else DatabaseCodeStore()
+    return import_string(path)()
@@ -0,0 +1,46 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class ServerBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = {
+        'status': 'Fail',
+        'message': 'Server band, birozdan keyin qayta urinib ko\'ring'
+    }
+    default_code = 'server_busy'
+
+
+class BoundedExecutor:
+    # PBKDF2 ni alohida thread'larda bajaradi. Ishlayotgan va navbatdagi
+    # vazifalar soni cheklangan: limitdan oshsa darhol ServerBusy (503).
+
+    def __init__(self, max_workers, max_queue):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hashing')
+        self.slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    def submit(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            raise ServerBusy()
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+
+hashing_executor = BoundedExecutor(
+    max_workers=getattr(settings, 'PASSWORD_HASHING_WORKERS', os.cpu_count() or 1),
+    max_queue=getattr(settings, 'PASSWORD_HASHING_QUEUE', 64)
+)
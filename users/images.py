@@ -0,0 +1,152 @@
+import hashlib
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import ExifTags, Image, ImageOps
+
+AVATAR_DIR = 'images/user'
+# Mijoz yuklagan xom fayl (EXIF bilan); URL i process_avatars ishlaguncha API da berilmaydi
+AVATAR_UPLOAD_DIR = 'images/user/uploads'
+# process_avatars yozadigan EXIF siz asl nusxa
+AVATAR_ORIGINAL_DIR = 'images/user/original'
+AVATAR_SIZES = (64, 150, 320)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+# Saqlanadigan kengaytma mijoz bergan nomdan emas, Pillow aniqlagan formatdan olinadi
+# (x.html nomli, lekin to'g'ri rasm bo'lgan fayl media'dan HTML bo'lib berilmasligi uchun)
+EXTENSIONS = {
+    'JPEG': '.jpg',
+    'PNG': '.png',
+    'GIF': '.gif',
+    'WEBP': '.webp',
+}
+
+
+def detect_extension(source):
+    # source: fayl yo'li yoki fayl obyekti; qo'llab-quvvatlanmagan yoki buzilgan rasmda ValueError
+    with Image.open(source) as image:
+        pil_format = image.format
+        image.verify()
+    if pil_format not in EXTENSIONS:
+        raise ValueError(f'Unsupported image format: {pil_format}')
+    return EXTENSIONS[pil_format]
+
+
+def content_hash(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def store_by_hash(file, directory):
+    # Bir xil fayl faqat bir marta saqlanadi: nomi - kontent sha256 xeshi
+    digest = content_hash(file)
+    extension = detect_extension(file)
+    file.seek(0)
+    name = f'{directory}/{digest}{extension}'
+    if not default_storage.exists(name):
+        name = default_storage.save(name, file)
+    return digest, name
+
+
+def open_image(name):
+    with default_storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        image.load()
+    # EXIF dagi burilishni qo'llab, keyin metama'lumotsiz qayta kodlanadi
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    return image
+
+
+def strip_metadata(name, directory, digest):
+    # EXIF (GPS, qurilma) siz nusxa alohida nom bilan yoziladi, xom fayl joyida qoladi.
+    # Olib tashlaydigan narsa bo'lmasa baytlar o'zgarmasdan ko'chiriladi; burilmagan JPEG
+    # asl kvantlash jadvallari bilan (quality='keep') qayta yoziladi, sifat yo'qolmaydi.
+    with default_storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        pil_format = image.format
+        target = f'{directory}/{digest}{EXTENSIONS[pil_format]}'
+        if default_storage.exists(target):
+            return target
+        exif = image.getexif()
+        if pil_format == 'GIF' or not exif:
+            source.seek(0)
+            return default_storage.save(target, ContentFile(source.read()))
+        image.load()
+
+    buffer = BytesIO()
+    if exif.get(ExifTags.Base.Orientation, 1) == 1:
+        options = {'quality': 'keep', 'subsampling': 'keep'} if pil_format == 'JPEG' else {}
+        image.save(buffer, pil_format, **options)
+    else:
+        options = {'quality': 95} if pil_format in ('JPEG', 'WEBP') else {}
+        ImageOps.exif_transpose(image).save(buffer, pil_format, **options)
+    return default_storage.save(target, ContentFile(buffer.getvalue()))
+
+
+def encode(image, fmt):
+    pil_format, options = FORMATS[fmt]
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def save_once(name, content):
+    if not default_storage.exists(name):
+        default_storage.save(name, content)
+    return name
+
+
+def variant_name(directory, digest, size, fmt):
+    return f'{directory}/variants/{digest}_{size}.{fmt}'
+
+
+def avatar_variant_names(digest):
+    return {
+        size: {fmt: variant_name(AVATAR_DIR, digest, size, fmt) for fmt in FORMATS}
+        for size in AVATAR_SIZES
+    }
+
+
+def build_avatar_variants(name, digest):
+    image = open_image(name)
+    for size, names in avatar_variant_names(digest).items():
+        thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        for fmt, variant in names.items():
+            if not default_storage.exists(variant):
+                save_once(variant, encode(thumbnail, fmt))
+
+
+def build_width_renditions(name, directory, key, widths):
+    # Kenglik bo'yicha kichraytirilgan nusxalar; JPEG draft() bilan kichik masshtabda
+    # o'qiladi, shuning uchun katta rasm ham to'liq xotiraga yoyilmaydi
+    with default_storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        width, height = image.size
+        target = max(widths)
+        if width > target:
+            image.draft('RGB', (target, max(1, height * target // width)))
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGB')
+
+    width, height = image.size
+    sizes = [size for size in widths if size <= width] or [width]
+    renditions = {}
+    for size in sizes:
+        resized = image if size == width else image.resize((size, max(1, height * size // width)), Image.LANCZOS)
+        renditions[str(size)] = {
+            fmt: save_once(variant_name(directory, key, size, fmt), encode(resized, fmt))
+            for fmt in FORMATS
+        }
+    return renditions
@@ -0,0 +1,89 @@
+import time
+
+from django.test import AsyncClient, Client
+
+from root.bench import BenchCommand, latency_stats, run_tasks, run_threads
+from users.models import UserConfirmation
+
+ENDPOINTS = {
+    'sync': {'signup': '/Users/user/', 'confirm': '/Users/code/', 'new_code': '/Users/new_code/'},
+    'async': {'signup': '/Users/async/user/', 'confirm': '/Users/async/code/', 'new_code': '/Users/async/new_code/'},
+}
+
+
+def expect(response, status_code, name):
+    if response.status_code != status_code:
+        raise RuntimeError(f'{name}: {response.status_code} {response.content[:200]!r}')
+    return response.json()
+
+
+def sync_flow(paths, email):
+    client, result = Client(), {}
+    started = time.perf_counter()
+    response = client.post(paths['signup'], {'email_or_phone': email}, content_type='application/json')
+    user = expect(response, 201, 'signup')
+    result['signup'] = (time.perf_counter() - started) * 1000
+    headers = {'Authorization': f"Bearer {user['access_token']}"}
+    code = UserConfirmation.objects.filter(user_id=user['id']).latest('id').code
+
+    started = time.perf_counter()
+    response = client.post(paths['confirm'], {'code': str(code)}, content_type='application/json', headers=headers)
+    expect(response, 200, 'confirm')
+    result['confirm'] = (time.perf_counter() - started) * 1000
+
+    # Kod tasdiqlangani uchun kutilayotgan kod yo'q, yangisi yuboriladi
+    started = time.perf_counter()
+    expect(client.get(paths['new_code'], headers=headers), 200, 'new_code')
+    result['new_code'] = (time.perf_counter() - started) * 1000
+    return result
+
+
+async def async_flow(paths, email):
+    client, result = AsyncClient(), {}
+    started = time.perf_counter()
+    response = await client.post(paths['signup'], {'email_or_phone': email}, content_type='application/json')
+    user = expect(response, 201, 'signup')
+    result['signup'] = (time.perf_counter() - started) * 1000
+    headers = {'Authorization': f"Bearer {user['access_token']}"}
+    code = (await UserConfirmation.objects.filter(user_id=user['id']).alatest('id')).code
+
+    started = time.perf_counter()
+    response = await client.post(paths['confirm'], {'code': str(code)}, content_type='application/json', headers=headers)
+    expect(response, 200, 'confirm')
+    result['confirm'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    expect(await client.get(paths['new_code'], headers=headers), 200, 'new_code')
+    result['new_code'] = (time.perf_counter() - started) * 1000
+    return result
+
+
+class Command(BenchCommand):
+    help = (
+        "signup -> confirm -> new_code oqimi bitta worker ichida: sync endpointlar WSGI thread'larida "
+        "va async endpointlar bitta event loop da; worker uchun requests/s va endpoint kechikishlari"
+    )
+    iterations = 5
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--concurrency', default='1,8', help='Parallel clientlar soni, vergul bilan')
+
+    def measure(self, options):
+        results = {}
+        for concurrency in [int(value) for value in options['concurrency'].split(',')]:
+            for mode, runner, flow in (('sync', run_threads, sync_flow), ('async', run_tasks, async_flow)):
+                paths = ENDPOINTS[mode]
+                samples, elapsed = runner(
+                    concurrency, options['iterations'],
+                    lambda worker, iteration: flow(paths, f'bench-{mode}-{concurrency}-{worker}-{iteration}@example.com')
+                )
+                flows = [result for result, _ in samples]
+                results[f'{mode} c={concurrency}'] = {
+                    'requests_per_s': round(len(flows) * len(paths) / elapsed, 2),
+                    **{
+                        f'{name}_p50_ms': latency_stats([flow_result[name] for flow_result in flows])['p50_ms']
+                        for name in paths
+                    },
+                }
+        return results
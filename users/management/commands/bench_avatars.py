@@ -0,0 +1,99 @@
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.utils import override_settings
+from PIL import ExifTags, Image
+from rest_framework.test import APIClient
+
+from root.bench import BenchCommand, latency_stats, timed
+from users.images import avatar_variant_names
+from users.management.commands.process_avatars import Command as ProcessAvatars
+from users.models import User
+
+
+def photo(seed, width, height):
+    # Mandelbrot har masshtabda detal beradi (kichraytirilganda ham), shovqin esa
+    # telefon suratiga yaqin siqilmaydigan hajm
+    channels = []
+    for index in range(3):
+        shift = (seed * 3 + index) * 0.01
+        fractal = Image.effect_mandelbrot((width, height), (-2.0 + shift, -1.2, 0.8 + shift, 1.2), 64 + index * 32)
+        channels.append(Image.blend(fractal, Image.effect_noise((width, height), 48), 0.35))
+    image = Image.merge('RGB', channels)
+    exif = Image.Exif()
+    exif[ExifTags.Base.Make] = 'Bench'
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=90, exif=exif)
+    return buffer.getvalue()
+
+
+class Command(BenchCommand):
+    help = (
+        "Avatar pipeline: yuklash so'rovi, process_avatars throughput (EXIF siz nusxa + WebP/JPEG "
+        "o'lchamlar) va profil ko'rinishida beriladigan baytlar (asl fayl va variantlar)"
+    )
+    iterations = 20
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--width', type=int, default=3000)
+        parser.add_argument('--height', type=int, default=2000)
+
+    def measure(self, options):
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            return self.run(options, media)
+
+    def run(self, options, media):
+        count = options['iterations']
+        images = [photo(index, options['width'], options['height']) for index in range(count)]
+        users = User.objects.bulk_create(
+            User(username=f'benchavatar{index}', email=f'bench-avatar-{index}@example.com') for index in range(count)
+        )
+        client = APIClient()
+        latencies = []
+        for user, content in zip(users, images):
+            client.force_authenticate(user)
+            response, ms = timed(
+                client.patch, '/Users/user_avatar/', {'avatar': SimpleUploadedFile('photo.jpg', content)},
+                format='multipart'
+            )
+            if response.status_code != 200:
+                raise RuntimeError(f'user_avatar: {response.status_code} {response.content[:200]!r}')
+            latencies.append(ms)
+        results = {'PATCH user_avatar': latency_stats(latencies)}
+
+        started = time.perf_counter()
+        processed = ProcessAvatars().process_batch(count)
+        elapsed = time.perf_counter() - started
+        results['process_avatars'] = {
+            'n': processed,
+            'avatars_per_s': round(processed / elapsed, 2),
+            'mean_ms': round(elapsed / processed * 1000, 1),
+        }
+
+        # Profil ko'rinishi: avval asl fayl, endi bitta o'lcham/format varianti
+        results['bytes: upload'] = {'mean_bytes': round(statistics.mean(map(len, images)))}
+        stored = list(User.objects.filter(id__in=[user.id for user in users]).values_list('avatar', 'avatar_hash'))
+        originals = [default_storage.size(name) for name, _ in stored]
+        results['bytes: original (no EXIF)'] = {'mean_bytes': round(statistics.mean(originals))}
+        digests = [digest for _, digest in stored]
+        for size, names in avatar_variant_names(digests[0]).items():
+            for fmt in names:
+                sizes = [default_storage.size(avatar_variant_names(digest)[size][fmt]) for digest in digests]
+                results[f'bytes: {size}px {fmt}'] = {'mean_bytes': round(statistics.mean(sizes))}
+
+        # Bir xil fayl qayta yuklanganda yangi fayl yozilmaydi
+        files = sum(len(names) for _, _, names in os.walk(media))
+        client.force_authenticate(users[1])
+        client.patch('/Users/user_avatar/', {'avatar': SimpleUploadedFile('again.jpg', images[0])}, format='multipart')
+        ProcessAvatars().process_batch(count)
+        results['dedup'] = {
+            'files_before': files,
+            'files_after_reupload': sum(len(names) for _, _, names in os.walk(media)),
+        }
+        return results
@@ -0,0 +1,46 @@
+import time
+
+from django.core.cache import caches
+
+from root.bench import BenchCommand, count_queries
+from root.caches import is_shared
+from users.code_store import CacheCodeStore, DatabaseCodeStore
+from users.models import VIA_EMAIL, User
+
+
+class Command(BenchCommand):
+    help = (
+        "Tasdiq kodi tekshiruvi throughput i: DatabaseCodeStore va CacheCodeStore uchun "
+        "has_pending, noto'g'ri va to'g'ri kod (default cache bilan; LocMem bo'lsa bitta jarayon)"
+    )
+    iterations = 2000
+
+    def measure(self, options):
+        count = options['iterations']
+        results = {}
+        for name, store in (('database', DatabaseCodeStore()), ('cache', CacheCodeStore())):
+            users = User.objects.bulk_create(
+                User(username=f'bench{name}{index}', email=f'bench-{name}-{index}@example.com')
+                for index in range(count)
+            )
+            for user in users:
+                store.create(user, VIA_EMAIL, '1234')
+
+            results[f'{name} has_pending'] = self.run(users, lambda user: store.has_pending(user))
+            results[f'{name} verify wrong'] = self.run(users, lambda user: store.verify(user, '9999'))
+            results[f'{name} verify ok'] = self.run(users, lambda user: store.verify(user, '1234'))
+        results['cache backend'] = {'backend': type(caches['default']).__name__, 'shared': str(is_shared())}
+        return results
+
+    @staticmethod
+    def run(users, operation):
+        with count_queries() as queries:
+            started = time.perf_counter()
+            for user in users:
+                operation(user)
+            elapsed = time.perf_counter() - started
+        return {
+            'ops_per_s': round(len(users) / elapsed, 1),
+            'us_per_op': round(elapsed / len(users) * 1e6, 1),
+            'queries': round(len(queries) / len(users), 2),
+        }
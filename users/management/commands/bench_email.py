@@ -0,0 +1,99 @@
+import socketserver
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from root.bench import BenchCommand, latency_stats, timed
+from users.management.commands.send_emails import Command as SendEmails
+from users.models import EmailOutbox, PENDING
+
+
+class SMTPStandIn(socketserver.StreamRequestHandler):
+    # Minimal SMTP: salomlashish va har bir xat server.delay soniya "yuboriladi"
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        time.sleep(self.server.delay)
+        self.reply('220 bench ESMTP')
+        while line := self.rfile.readline():
+            command = line[:4].upper()
+            if command == b'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                time.sleep(self.server.delay)
+                self.reply('250 OK')
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                break
+            else:
+                self.reply('250 OK')
+
+
+class Command(BenchCommand):
+    help = (
+        "Lokal SMTP o'rinbosari bilan signup kechikishini xat navbatga qo'yilganda va "
+        "so'rov ichida send_mail qilinganda (eski yo'l) solishtiradi, send_emails worker "
+        "throughput ini ham o'lchaydi"
+    )
+    iterations = 50
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--smtp-delays', default='0,0.05', help="SMTP javob kechikishlari, soniya, vergul bilan")
+
+    def measure(self, options):
+        results = {}
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SMTPStandIn)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        smtp = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=server.server_address[1],
+            EMAIL_HOST_USER='bench@example.com',
+            EMAIL_HOST_PASSWORD='',
+            EMAIL_USE_TLS=False,
+            EMAIL_USE_SSL=False,
+        )
+        try:
+            with smtp:
+                for delay in [float(value) for value in options['smtp_delays'].split(',')]:
+                    server.delay = delay
+                    results.update(self.measure_delay(delay, options['iterations']))
+        finally:
+            server.shutdown()
+            server.server_close()
+        return results
+
+    def measure_delay(self, delay, iterations):
+        client = APIClient()
+        label = f'smtp {delay * 1000:g}ms'
+        outbox, inline = [], []
+        for index in range(iterations):
+            email = f'bench-{delay}-{index}@example.com'
+            response, ms = timed(client.post, '/Users/user/', {'email_or_phone': email}, format='json')
+            if response.status_code != 201:
+                raise RuntimeError(f'signup: {response.status_code} {response.content[:200]!r}')
+            outbox.append(ms)
+            # Eski yo'l: xat so'rov ichida alohida SMTP ulanish bilan yuborilardi
+            _, send_ms = timed(send_mail, 'Tasdiq kodi', 'Your code: 1234', settings.EMAIL_HOST_USER, [email])
+            inline.append(ms + send_ms)
+
+        pending = EmailOutbox.objects.filter(status=PENDING).count()
+        started = time.perf_counter()
+        sent, failed = SendEmails().send_batch(pending, max_attempts=5, backoff=30)
+        elapsed = time.perf_counter() - started
+        if failed:
+            raise RuntimeError(f'send_emails: {failed} ta xat yuborilmadi')
+        return {
+            f'{label} signup+outbox': latency_stats(outbox),
+            f'{label} signup+send_mail': latency_stats(inline),
+            f'{label} worker': {'n': sent, 'msg_per_s': round(sent / elapsed, 1)},
+        }
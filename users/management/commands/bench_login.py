@@ -0,0 +1,52 @@
+from django.test import AsyncClient, Client
+
+from root.bench import BenchCommand, latency_stats, run_tasks, run_threads
+from users.models import User
+
+PASSWORD = 'Bench-pass-2024'
+
+
+def summarize(samples, elapsed):
+    statuses = [response.status_code for response, _ in samples]
+    unexpected = set(statuses) - {200, 503}
+    if unexpected:
+        raise RuntimeError(f'login: kutilmagan status {sorted(unexpected)}')
+    return {
+        **latency_stats([ms for _, ms in samples]),
+        'ok_per_s': round(statuses.count(200) / elapsed, 2),
+        'shed_503': statuses.count(503),
+    }
+
+
+class Command(BenchCommand):
+    help = (
+        "Login p50/p99 kechikishi ortib boruvchi parallellikda: sync UserLoginAPIView (WSGI thread'lar) "
+        "va async AsyncUserLoginView (bitta event loop + hashing_executor)"
+    )
+    iterations = 4
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--concurrency', default='1,4,16', help='Parallel clientlar soni, vergul bilan')
+
+    def measure(self, options):
+        User.objects.create(username='benchlogin', email='bench-login@example.com', password=PASSWORD)
+        body = {'username': 'benchlogin', 'password': PASSWORD}
+        results = {}
+        for concurrency in [int(value) for value in options['concurrency'].split(',')]:
+            clients = [Client() for _ in range(concurrency)]
+            samples, elapsed = run_threads(
+                concurrency, options['iterations'],
+                lambda worker, _: clients[worker].post('/Users/user-login/', body, content_type='application/json')
+            )
+            results[f'sync c={concurrency}'] = summarize(samples, elapsed)
+
+            async_clients = [AsyncClient() for _ in range(concurrency)]
+            samples, elapsed = run_tasks(
+                concurrency, options['iterations'],
+                lambda worker, _: async_clients[worker].post(
+                    '/Users/async/user-login/', body, content_type='application/json'
+                )
+            )
+            results[f'async c={concurrency}'] = summarize(samples, elapsed)
+        return results
@@ -0,0 +1,103 @@
+import datetime
+import io
+import time
+import uuid
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from root.bench import BenchCommand, count_queries, latency_stats, timed
+from users.blacklist import TokenBlacklist, token_blacklist
+from users.models import User
+from users.tokens import token_service
+
+
+class Command(BenchCommand):
+    help = (
+        "Millionlab qora ro'yxatdagi tokenlar bilan: Bloom filtrni qurish, a'zolik tekshiruvi "
+        "(faqat baza bilan solishtirib), token-refresh throughput va flush_tokens"
+    )
+    iterations = 500
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--blacklisted', type=int, default=1000000)
+        parser.add_argument('--expired-ratio', type=float, default=0.1, help='flush_tokens uchun eskirgan ulush')
+
+    def measure(self, options):
+        user = User.objects.create(username='benchrefresh', email='bench-refresh@example.com')
+        _, populate_ms = timed(self.populate, user, options['blacklisted'], options['expired_ratio'])
+        results = {'blacklisted tokens': {'rows': options['blacklisted'], 'insert_s': round(populate_ms / 1000, 1)}}
+
+        blacklist = TokenBlacklist(capacity=options['blacklisted'])
+        _, build_ms = timed(blacklist.sync)
+        results['bloom filter build'] = {
+            'seconds': round(build_ms / 1000, 2),
+            'mbytes': round(len(blacklist.filter.bits) / 2 ** 20, 1),
+        }
+
+        known = list(
+            BlacklistedToken.objects.order_by('?').values_list('token__jti', flat=True)[:options['iterations']]
+        )
+        unknown = [uuid.uuid4().hex for _ in range(options['iterations'])]
+        checks = {
+            'check clean (filter)': (blacklist.is_blacklisted, unknown),
+            'check clean (db only)': (self.db_only, unknown),
+            'check blacklisted (filter)': (blacklist.is_blacklisted, known),
+            'check blacklisted (db only)': (self.db_only, known),
+        }
+        for name, (check, jtis) in checks.items():
+            with count_queries() as queries:
+                latencies = [timed(check, jti)[1] for jti in jtis]
+            results[name] = {**latency_stats(latencies), 'queries': round(len(queries) / len(jtis), 2)}
+        false_positives = sum(1 for jti in unknown if jti in blacklist.filter)
+        results['check clean (filter)']['false_pos'] = false_positives
+
+        client = APIClient()
+        url = reverse('token-refresh')
+        tokens = [token_service.for_user(user)['refresh_token'] for _ in range(options['iterations'])]
+        # Endpoint ishlatadigan filtr oldindan quriladi (qurish narxi yuqorida alohida)
+        token_blacklist.sync()
+        started = time.perf_counter()
+        latencies = []
+        for token in tokens:
+            response, ms = timed(client.post, url, {'refresh': token}, format='json')
+            if response.status_code != 200:
+                raise RuntimeError(f'token-refresh: {response.status_code} {response.content[:200]!r}')
+            latencies.append(ms)
+        results['POST token-refresh'] = {
+            **latency_stats(latencies),
+            'per_s': round(len(tokens) / (time.perf_counter() - started), 1),
+        }
+
+        _, flush_ms = timed(call_command, 'flush_tokens', chunk_size=1000, stdout=io.StringIO())
+        results['flush_tokens'] = {
+            'seconds': round(flush_ms / 1000, 2),
+            'rows': round(options['blacklisted'] * options['expired_ratio']),
+        }
+        return results
+
+    @staticmethod
+    def db_only(jti):
+        # Filtrsiz yo'l: har refresh'da BlacklistedToken ga so'rov
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    @staticmethod
+    def populate(user, count, expired_ratio, batch_size=50000):
+        now = timezone.now()
+        expired = int(count * expired_ratio)
+        for start in range(0, count, batch_size):
+            tokens = OutstandingToken.objects.bulk_create([
+                OutstandingToken(
+                    user=user,
+                    jti=uuid.uuid4().hex,
+                    token='bench',
+                    created_at=now,
+                    expires_at=now + datetime.timedelta(days=-1 if index < expired else 1)
+                )
+                for index in range(start, min(start + batch_size, count))
+            ])
+            BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token) for token in tokens])
@@ -0,0 +1,48 @@
+import time
+
+from django.test import RequestFactory
+from drf_spectacular.views import SpectacularAPIView
+
+from root.bench import BenchCommand, latency_stats
+from root.schema import CachedSchema, SchemaView, cached_schema
+
+
+class Command(BenchCommand):
+    help = (
+        "api/schema/ narxi: har so'rovda generatsiya qiladigan SpectacularAPIView va "
+        "oldindan tayyorlangan SchemaView (oddiy, gzip, 304) - kechikish va CPU vaqti"
+    )
+    iterations = 50
+    uses_database = False
+
+    def measure(self, options):
+        factory = RequestFactory()
+        _, load_ms, load_cpu = self.clock(CachedSchema().load)
+        schema = cached_schema.get()
+        spectacular = SpectacularAPIView.as_view()
+        cached = SchemaView.as_view()
+        scenarios = {
+            'SpectacularAPIView': lambda: spectacular(factory.get('/api/schema/')).render(),
+            'SchemaView': lambda: cached(factory.get('/api/schema/')),
+            'SchemaView gzip': lambda: cached(factory.get('/api/schema/', HTTP_ACCEPT_ENCODING='gzip')),
+            'SchemaView 304': lambda: cached(factory.get(
+                '/api/schema/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=schema.gzip_etag
+            )),
+        }
+        results = {'CachedSchema.load (once)': {'p50_ms': round(load_ms, 3), 'cpu_ms': round(load_cpu, 3)}}
+        for name, call in scenarios.items():
+            # Spectacular juda sekin, unga iteratsiyalarning o'ndan biri yetadi
+            iterations = max(1, options['iterations'] // 10) if name == 'SpectacularAPIView' else options['iterations']
+            samples = [self.clock(call) for _ in range(iterations)]
+            results[name] = {
+                **latency_stats([ms for _, ms, _ in samples]),
+                'cpu_ms': round(sum(cpu for _, _, cpu in samples) / iterations, 3),
+                'bytes': len(samples[-1][0].content),
+            }
+        return results
+
+    @staticmethod
+    def clock(call):
+        started, cpu_started = time.perf_counter(), time.process_time()
+        result = call()
+        return result, (time.perf_counter() - started) * 1000, (time.process_time() - cpu_started) * 1000
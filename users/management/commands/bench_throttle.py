@@ -0,0 +1,75 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.test.utils import override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from root.bench import BenchCommand, latency_stats, timed
+from users.throttling import LOGIN_THROTTLES
+
+OPEN_RATES = {'login': '1000000000/m', 'login_ip': '1000000000/m', 'login_contact': '1000000000/m'}
+CLOSED_RATES = {'login': '1/d', 'login_ip': '1/d', 'login_contact': '1/d'}
+
+
+class Command(BenchCommand):
+    help = (
+        "Login throttle'larining har so'rovga qo'shadigan vaqti (mikrosekundlarda): har bir throttle "
+        "va butun LOGIN_THROTTLES to'plami, o'tkazilgan va rad etilgan yo'l, hamda 429 javobi"
+    )
+    iterations = 20000
+
+    def measure(self, options):
+        factory = APIRequestFactory()
+        request = Request(
+            factory.post('/Users/user-login/', {'username': '+998 90 123-45-67', 'password': 'x'}, format='json'),
+            parsers=[JSONParser()]
+        )
+        request.data
+        results = {}
+        for state, rates in (('allowed', OPEN_RATES), ('rejected', CLOSED_RATES)):
+            with self.rates(rates):
+                cache.clear()
+                for throttle_class in LOGIN_THROTTLES:
+                    throttle = throttle_class()
+                    throttle.allow_request(request, None)
+                    results[f'{throttle_class.__name__} {state}'] = self.run(
+                        lambda: throttle.allow_request(request, None), options['iterations']
+                    )
+                throttles = [throttle_class() for throttle_class in LOGIN_THROTTLES]
+                results[f'LOGIN_THROTTLES {state}'] = self.run(
+                    lambda: all(throttle.allow_request(request, None) for throttle in throttles), options['iterations']
+                )
+
+        with self.rates(CLOSED_RATES):
+            client = APIClient()
+            body = {'username': 'benchthrottle', 'password': 'x'}
+            # Har bir 429 uchun django.request ogohlantirishi chiqmasligi uchun
+            logging.disable(logging.WARNING)
+            try:
+                client.post('/Users/user-login/', body, format='json')
+                samples = [timed(client.post, '/Users/user-login/', body, format='json') for _ in range(1000)]
+            finally:
+                logging.disable(logging.NOTSET)
+            if {response.status_code for response, _ in samples} != {429}:
+                raise RuntimeError('login: 429 kutilgan edi')
+            results['POST user-login 429'] = {
+                **latency_stats([ms for _, ms in samples]),
+                'us_per_call': round(sum(ms for _, ms in samples) / len(samples) * 1000, 2),
+            }
+        results['cache backend'] = {'backend': type(caches['default']).__name__}
+        return results
+
+    @staticmethod
+    def rates(rates):
+        return override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates})
+
+    @staticmethod
+    def run(call, iterations):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            call()
+        return {'us_per_call': round((time.perf_counter() - started) / iterations * 1e6, 2)}
@@ -0,0 +1,48 @@
+import time
+
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from root.bench import BenchCommand, count_queries
+from users.models import User
+from users.tokens import TokenService, token_service
+
+
+def simplejwt_pair(user):
+    refresh = RefreshToken.for_user(user)
+    return {'access_token': str(refresh.access_token), 'refresh_token': str(refresh)}
+
+
+def old_view_pairs(user):
+    # Eski confirm/login view: user.token() ikki marta chaqirilardi
+    return simplejwt_pair(user)['access_token'], simplejwt_pair(user)['refresh_token']
+
+
+class Command(BenchCommand):
+    help = "JWT juftligi chiqarish tezligi: eski view yo'li, RefreshToken.for_user va token_service"
+    iterations = 2000
+
+    def measure(self, options):
+        user = User.objects.create(username='benchtokens', email='bench-tokens@example.com')
+        # OutstandingToken INSERT siz: faqat claim'lar va imzolash
+        signing_only = TokenService()
+        signing_only.track_outstanding = False
+        scenarios = {
+            'old view (2x for_user)': old_view_pairs,
+            'RefreshToken.for_user': simplejwt_pair,
+            'token_service': token_service.for_user,
+            'token_service (signing only)': signing_only.for_user,
+        }
+        results = {}
+        for name, issue in scenarios.items():
+            issue(user)
+            with count_queries() as queries:
+                started = time.perf_counter()
+                for _ in range(options['iterations']):
+                    issue(user)
+                elapsed = time.perf_counter() - started
+            results[name] = {
+                'requests_per_s': round(options['iterations'] / elapsed, 1),
+                'us_per_request': round(elapsed / options['iterations'] * 1e6, 1),
+                'queries': len(queries) // options['iterations'],
+            }
+        return results
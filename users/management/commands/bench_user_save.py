@@ -0,0 +1,55 @@
+import time
+
+from root.bench import BenchCommand, count_queries
+from users.models import NEW, VERIFICATION_CODE, User
+
+
+def full_save(user):
+    # O'zgarishlarni kuzatishdan oldingi User.save: har doim clean() va barcha ustunlar
+    user.clean()
+    super(User, user).save()
+
+
+def confirm(user, index):
+    user.auth_stats = VERIFICATION_CODE if user.auth_stats == NEW else NEW
+
+
+def profile(user, index):
+    user.first_name = f'Bench{index}'
+    user.last_name = f'User{index}'
+
+
+def unchanged(user, index):
+    pass
+
+
+class Command(BenchCommand):
+    help = (
+        "Confirm (auth_stats) va profil (ism) yangilashda User.save narxi: so'rovlar, "
+        "UPDATE uzunligi va CPU vaqti, eski to'liq saqlash bilan solishtirib"
+    )
+    iterations = 2000
+
+    def measure(self, options):
+        user = User.objects.create(username='benchsave', email='bench-save@example.com', password='Bench-pass-2024')
+        user = User.objects.get(id=user.id)
+        results = {}
+        for flow_name, change in (('confirm', confirm), ('profile', profile), ('unchanged', unchanged)):
+            for save_name, save in (('full save', full_save), ('tracked save', User.save)):
+                results[f'{flow_name} {save_name}'] = self.run(user, change, save, options['iterations'])
+        return results
+
+    @staticmethod
+    def run(user, change, save, iterations):
+        with count_queries() as queries:
+            started, cpu_started = time.perf_counter(), time.process_time()
+            for index in range(iterations):
+                change(user, index)
+                save(user)
+            elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+        return {
+            'us_per_save': round(elapsed / iterations * 1e6, 1),
+            'cpu_us': round(cpu / iterations * 1e6, 1),
+            'queries': round(len(queries) / iterations, 2),
+            'sql_chars': round(sum(map(len, queries)) / max(len(queries), 1)),
+        }
@@ -0,0 +1,194 @@
+import datetime
+import json
+import statistics
+import threading
+import time
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+
+from root.bench import bench_database, count_queries, percentile
+from users.code_store import CacheCodeStore
+from users.models import UserConfirmation
+
+BUDGETS_FILE = Path(__file__).resolve().parents[2] / 'bench_budgets.json'
+ENDPOINTS = ('signup', 'new_code', 'confirm', 'change', 'login')
+PASSWORD = 'Bench-pass-2024'
+
+
+class Command(BaseCommand):
+    help = (
+        "signup -> new_code -> confirm -> change -> login oqimini vaqtinchalik bazada yurgizib, "
+        "har endpoint uchun kechikish persentillari, throughput va SQL so'rovlar sonini "
+        "bench_budgets.json dagi chegaralar bilan solishtiradi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Har bir client uchun oqimlar soni')
+        parser.add_argument('--warmup', type=int, default=3, help="Hisobga olinmaydigan boshlang'ich oqimlar")
+        parser.add_argument('--concurrency', type=int, default=1, help='Parallel clientlar (thread) soni')
+        parser.add_argument('--budgets', default=str(BUDGETS_FILE))
+        parser.add_argument('--write-budgets', action='store_true', help="Joriy natijalardan budjet faylini yozish")
+        parser.add_argument('--json', dest='json_path', help='Natijalarni JSON faylga yozish')
+
+    def handle(self, *args, **options):
+        results = self.run(options)
+        self.report(results)
+        if options['json_path']:
+            Path(options['json_path']).write_text(json.dumps(results, indent=2))
+        if options['write_budgets']:
+            self.write_budgets(results, Path(options['budgets']))
+        else:
+            self.check_budgets(results, Path(options['budgets']))
+
+    def run(self, options):
+        # Xatlar locmem backendga ketadi (setup_test_environment)
+        with bench_database():
+            return self.measure(options)
+
+    def measure(self, options):
+        samples = {name: [] for name in ENDPOINTS}
+        errors = []
+        lock = threading.Lock()
+
+        def client_worker(worker):
+            try:
+                for iteration in range(options['warmup'] + options['iterations']):
+                    flow = self.flow(f'{worker}-{iteration}')
+                    if iteration >= options['warmup']:
+                        with lock:
+                            for name, sample in flow.items():
+                                samples[name].append(sample)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                if threading.current_thread() is not threading.main_thread():
+                    connection.close()
+
+        started = time.perf_counter()
+        if options['concurrency'] == 1:
+            client_worker(0)
+        else:
+            threads = [threading.Thread(target=client_worker, args=(worker,)) for worker in range(options['concurrency'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - started
+        if errors:
+            raise CommandError(f'Benchmark oqimi xato bilan tugadi: {errors[0]!r}')
+
+        flows = options['iterations'] * options['concurrency']
+        return {
+            'concurrency': options['concurrency'],
+            'flows': flows,
+            'flows_per_second': round(flows / elapsed, 2),
+            'endpoints': {name: self.summarize(values, options['concurrency']) for name, values in samples.items()},
+        }
+
+    def flow(self, suffix):
+        client = APIClient()
+        result = {}
+
+        response, result['signup'] = self.call(client.post, '/Users/user/', {'email_or_phone': f'bench-{suffix}@example.com'})
+        user_id = self.expect(response, 201, 'signup').json()['id']
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()["access_token"]}')
+
+        # Yangi kod so'rash uchun kutilayotgan kod muddati o'tgan qilinadi (o'lchanmaydi)
+        UserConfirmation.objects.filter(user_id=user_id).update(
+            expire_time=datetime.datetime.now() - datetime.timedelta(minutes=1)
+        )
+        cache.delete(f'{CacheCodeStore.key_prefix}:{user_id}')
+        response, result['new_code'] = self.call(client.get, '/Users/new_code/')
+        self.expect(response, 200, 'new_code')
+
+        code = UserConfirmation.objects.filter(user_id=user_id).latest('id').code
+        response, result['confirm'] = self.call(client.post, '/Users/code/', {'code': str(code)})
+        self.expect(response, 200, 'confirm')
+
+        username = f'bench{suffix}'.replace('-', '_')
+        response, result['change'] = self.call(client.put, '/Users/user_change/', {
+            'first_name': 'Bench',
+            'last_name': 'User',
+            'username': username,
+            'password': PASSWORD,
+            'confirm_password': PASSWORD
+        })
+        self.expect(response, 200, 'change')
+
+        client.credentials()
+        response, result['login'] = self.call(client.post, '/Users/user-login/', {'username': username, 'password': PASSWORD})
+        self.expect(response, 200, 'login')
+        return result
+
+    @staticmethod
+    def call(method, path, data=None):
+        with count_queries() as queries:
+            started = time.perf_counter()
+            response = method(path, data, format='json') if data is not None else method(path)
+            latency = time.perf_counter() - started
+        return response, {'ms': latency * 1000, 'queries': len(queries)}
+
+    @staticmethod
+    def expect(response, status_code, name):
+        if response.status_code != status_code:
+            raise CommandError(f'{name}: {response.status_code} {response.content[:200]!r}')
+        return response
+
+    def summarize(self, samples, concurrency):
+        latencies = [sample['ms'] for sample in samples]
+        queries = [sample['queries'] for sample in samples]
+        return {
+            'requests': len(samples),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'max_ms': round(max(latencies), 2),
+            'mean_ms': round(statistics.mean(latencies), 2),
+            # Endpoint yolg'iz shu parallellikda yurganda beradigan throughput
+            'requests_per_second': round(len(samples) * concurrency / sum(latencies) * 1000, 2),
+            'queries_max': max(queries),
+            'queries_median': statistics.median(queries),
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f"concurrency={results['concurrency']} flows={results['flows']} "
+            f"flows/s={results['flows_per_second']}"
+        )
+        self.stdout.write(f"{'endpoint':<10} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'req/s':>8} {'queries':>8}")
+        for name, stats in results['endpoints'].items():
+            self.stdout.write(
+                f"{name:<10} {stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} "
+                f"{stats['max_ms']:>8} {stats['requests_per_second']:>8} {stats['queries_max']:>8}"
+            )
+
+    def write_budgets(self, results, path):
+        # So'rovlar soni aniq, kechikish esa mashinalar farqi uchun 3 barobar (kamida 50ms) zaxira bilan
+        budgets = {
+            name: {'queries': stats['queries_max'], 'p95_ms': round(max(stats['p95_ms'] * 3, 50), 1)}
+            for name, stats in results['endpoints'].items()
+        }
+        path.write_text(json.dumps(budgets, indent=4) + '\n')
+        self.stdout.write(f'budgets -> {path}')
+
+    def check_budgets(self, results, path):
+        if not path.exists():
+            raise CommandError(f'Budjet fayli topilmadi: {path}')
+        budgets = json.loads(path.read_text())
+        regressions = []
+        for name, budget in budgets.items():
+            stats = results['endpoints'].get(name)
+            if stats is None:
+                continue
+            if stats['queries_max'] > budget['queries']:
+                regressions.append(f"{name}: queries {stats['queries_max']} > {budget['queries']}")
+            # Parallel rejimda kechikish navbatni ham o'z ichiga oladi, faqat so'rovlar tekshiriladi
+            if results['concurrency'] == 1 and stats['p95_ms'] > budget['p95_ms']:
+                regressions.append(f"{name}: p95 {stats['p95_ms']}ms > {budget['p95_ms']}ms")
+        if regressions:
+            raise CommandError('Benchmark budjetidan oshdi:\n' + '\n'.join(regressions))
+        self.stdout.write('budgets OK')
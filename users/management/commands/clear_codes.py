@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from users.models import UserConfirmation
+
+
+class Command(BaseCommand):
+    help = "Muddati o'tgan yoki tasdiqlangan UserConfirmation yozuvlarini bo'laklab o'chiradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help='Bo\'laklar orasidagi pauza (soniya)')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        stale = UserConfirmation.objects.filter(Q(expire_time__lt=now) | Q(is_confirmed=True))
+        total = 0
+        while True:
+            ids = list(stale.values_list('id', flat=True)[:options['chunk_size']])
+            if not ids:
+                break
+            deleted, _ = UserConfirmation.objects.filter(id__in=ids).delete()
+            total += deleted
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(f'deleted={total}')
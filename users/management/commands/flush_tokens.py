@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from users.blacklist import GENERATION_KEY, TokenBlacklist
+
+
+class Command(BaseCommand):
+    help = "Muddati o'tgan OutstandingToken (va ularning BlacklistedToken) yozuvlarini bo'laklab o'chiradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help='Bo\'laklar orasidagi pauza (soniya)')
+
+    def handle(self, *args, **options):
+        expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+        total = 0
+        while True:
+            ids = list(expired.order_by('id').values_list('id', flat=True)[:options['chunk_size']])
+            if not ids:
+                break
+            deleted, _ = OutstandingToken.objects.filter(id__in=ids).delete()
+            total += deleted
+            if options['pause']:
+                time.sleep(options['pause'])
+        if total:
+            # Bloom filtrdan o'chirib bo'lmaydi: workerlar uni noldan qayta quradi
+            TokenBlacklist.bump(GENERATION_KEY)
+        self.stdout.write(f'deleted={total}')
@@ -0,0 +1,62 @@
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from users.authentication import user_cache
+from users.images import AVATAR_ORIGINAL_DIR, AVATAR_UPLOAD_DIR, build_avatar_variants, strip_metadata
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Yangi yuklangan avatarlardan EXIF ni olib tashlaydi va WebP/JPEG o'lchamlarini yasaydi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--interval', type=float, default=5.0, help='Navbat bo\'sh bo\'lganda kutish (soniya)')
+        parser.add_argument('--once', action='store_true', help='Bitta batchni ishlab chiqib ketish')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.process_batch(options['batch_size'])
+            if processed:
+                self.stdout.write(f'processed={processed}')
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
+
+    def process_batch(self, batch_size):
+        users = list(
+            User.objects.filter(avatar_processed=False).exclude(avatar_hash='')
+            .only('id', 'avatar', 'avatar_hash', 'avatar_processed')[:batch_size]
+        )
+        for user in users:
+            upload, digest = user.avatar.name, user.avatar_hash
+            try:
+                name = strip_metadata(upload, AVATAR_ORIGINAL_DIR, digest)
+                build_avatar_variants(name, digest)
+            except Exception as exc:
+                self.stderr.write(f'user={user.id} {exc}')
+                # Buzuq fayl navbatni to'sib qo'ymasligi uchun avatar olib tashlanadi
+                updates = {'avatar': None, 'avatar_hash': ''}
+            else:
+                updates = {'avatar': name, 'avatar_processed': True}
+            # Ishlash paytida yangi avatar yuklangan bo'lsa qator o'zgarmaydi va fayllar o'chirilmaydi:
+            # yangi yuklama navbatda qoladi
+            matched = User.objects.filter(
+                id=user.id, avatar=upload, avatar_hash=digest, avatar_processed=False
+            ).update(**updates)
+            if matched:
+                # update() post_save signalini chaqirmaydi
+                user_cache.invalidate(user.id)
+                self.remove_upload(upload)
+        return len(users)
+
+    @staticmethod
+    def remove_upload(name):
+        # Xom fayl (EXIF bilan) boshqa navbatdagi foydalanuvchi ishlatmayotgan bo'lsa o'chiriladi
+        if not name.startswith(f'{AVATAR_UPLOAD_DIR}/'):
+            return
+        if not User.objects.filter(avatar=name, avatar_processed=False).exclude(avatar_hash='').exists():
+            default_storage.delete(name)
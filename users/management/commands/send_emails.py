@@ -0,0 +1,114 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import EmailOutbox, PENDING, SENT, FAILED
+
+
+class Command(BaseCommand):
+    help = "EmailOutbox navbatidagi xatlarni bitta SMTP ulanish orqali yuboradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument('--backoff', type=int, default=30, help='Birinchi qayta urinishgacha soniyalar')
+        parser.add_argument('--interval', type=float, default=2.0, help='Navbat bo\'sh bo\'lganda kutish (soniya)')
+        parser.add_argument('--once', action='store_true', help='Bitta batchni yuborib chiqib ketish')
+        parser.add_argument(
+            '--retention-days', type=float, default=7.0, help='SENT xatlar shuncha kundan keyin o\'chiriladi'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = self.send_batch(options['batch_size'], options['max_attempts'], options['backoff'])
+            if sent or failed:
+                self.stdout.write(f'sent={sent} failed={failed}')
+            if not sent and not failed:
+                # Navbat bo'sh paytda eski SENT yozuvlar bittadan batch bilan tozalanadi
+                purged = self.purge_sent(options['retention_days'], options['batch_size'])
+                if purged:
+                    self.stdout.write(f'purged={purged}')
+            if options['once']:
+                break
+            if not sent and not failed:
+                time.sleep(options['interval'])
+
+    @staticmethod
+    def purge_sent(retention_days, batch_size):
+        cutoff = timezone.now() - datetime.timedelta(days=retention_days)
+        ids = list(
+            EmailOutbox.objects.filter(status=SENT, sent_at__lt=cutoff).values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        deleted, _ = EmailOutbox.objects.filter(id__in=ids).delete()
+        return deleted
+
+    @staticmethod
+    def claim_batch(batch_size):
+        with transaction.atomic():
+            batch = list(
+                EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                    status=PENDING,
+                    next_attempt_at__lte=timezone.now()
+                ).order_by('next_attempt_at')[:batch_size]
+            )
+            # Boshqa worker shu xatlarni qayta olmasligi uchun vaqtincha keyinga suriladi
+            EmailOutbox.objects.filter(id__in=[item.id for item in batch]).update(
+                next_attempt_at=timezone.now() + datetime.timedelta(minutes=5)
+            )
+        return batch
+
+    def send_batch(self, batch_size, max_attempts, backoff):
+        batch = self.claim_batch(batch_size)
+        if not batch:
+            return 0, 0
+
+        sent = failed = 0
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as exc:
+            for item in batch:
+                self.mark_failed(item, exc, max_attempts, backoff)
+            return 0, len(batch)
+
+        try:
+            for item in batch:
+                message = EmailMessage(
+                    subject=item.subject,
+                    body=item.message,
+                    from_email=settings.EMAIL_HOST_USER,
+                    to=[item.email],
+                    connection=connection
+                )
+                try:
+                    connection.send_messages([message])
+                except Exception as exc:
+                    self.mark_failed(item, exc, max_attempts, backoff)
+                    failed += 1
+                else:
+                    item.status = SENT
+                    item.sent_at = timezone.now()
+                    item.attempts += 1
+                    item.save(update_fields=['status', 'sent_at', 'attempts', 'updated_at'])
+                    sent += 1
+        finally:
+            connection.close()
+        return sent, failed
+
+    @staticmethod
+    def mark_failed(item, exc, max_attempts, backoff):
+        item.attempts += 1
+        item.last_error = str(exc)
+        if item.attempts >= max_attempts:
+            item.status = FAILED
+        else:
+            delay = backoff * 2 ** (item.attempts - 1)
+            item.next_attempt_at = timezone.now() + datetime.timedelta(seconds=delay)
+        item.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'updated_at'])
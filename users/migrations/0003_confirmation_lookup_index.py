@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userconfirmation',
+            index=models.Index(fields=['user', 'is_confirmed', 'expire_time', 'code'], name='confirmation_lookup_idx'),
+        ),
+    ]
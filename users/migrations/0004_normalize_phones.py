@@ -0,0 +1,26 @@
+import re
+
+from django.db import migrations
+
+
+def normalize_phones(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    taken = set(User.objects.exclude(phone=None).values_list('phone', flat=True))
+    for user in User.objects.exclude(phone=None).exclude(phone='').only('id', 'phone').iterator():
+        phone = re.sub(r'\D', '', user.phone)
+        # Normallashgandan keyin boshqa foydalanuvchi bilan to'qnashsa tegilmaydi
+        if phone == user.phone or phone in taken:
+            continue
+        taken.add(phone)
+        User.objects.filter(id=user.id).update(phone=phone)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_confirmation_lookup_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_phones, migrations.RunPython.noop),
+    ]
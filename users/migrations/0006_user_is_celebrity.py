@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 22:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_avatar_pipeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='is_celebrity',
+            field=models.BooleanField(default=False),
+        ),
+    ]
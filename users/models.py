@@ -2,9 +2,13 @@ import datetime
 import random
 import uuid
 
+from django.contrib.auth.hashers import identify_hasher
 from django.contrib.auth.models import AbstractUser
-from django.db import models
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.db import models, transaction, IntegrityError
+from django.utils import timezone
+
+from users.tokens import token_service
+from users.username import generate_username
 
 ADMIN = 'admin'
 USER = 'user'
@@ -18,6 +22,10 @@ VERIFICATION_CODE = 'verification_code'
 DONE = 'done'
 PHOTO_STEP = 'photo_step'
 
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+
 
 class BaseCreatedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -50,10 +58,24 @@ class User(AbstractUser, BaseCreatedModel):
     email = models.EmailField(unique=True, null=True, blank=True)
     bio = models.TextField(blank=True, null=True)
     avatar = models.ImageField(blank=True, null=True, upload_to='images/user/')
+    avatar_hash = models.CharField(max_length=64, blank=True)
+    avatar_processed = models.BooleanField(default=False)
+    # qost.timeline: obunachisi ko'p muallif, postlari lentaga o'qish paytida qo'shiladi
+    is_celebrity = models.BooleanField(default=False)
     user_status = models.CharField(max_length=255, choices=USER_STATUS, default=USER)
     auth_stats = models.CharField(max_length=255, choices=AUTH_STATUS, default=NEW)
     auth_type = models.CharField(max_length=255, choices=AUTH_TYPE)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # process_avatars navbati: faqat ishlanmagan avatarlar indekslanadi
+            models.Index(
+                fields=['id'],
+                condition=models.Q(avatar_processed=False) & ~models.Q(avatar_hash=''),
+                name='user_avatar_pending_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.username
 
@@ -62,21 +84,24 @@ class User(AbstractUser, BaseCreatedModel):
         return f'{self.first_name} {self.last_name}'
 
     def create_verification_code(self, verification_type):
+        from users.code_store import get_code_store
+
+        code = "".join([str(random.randint(1, 9)) for _ in range(4)])
+        get_code_store().create(self, verification_type, code)
+
+        return code
+
+    async def acreate_verification_code(self, verification_type):
+        from users.code_store import get_code_store
+
         code = "".join([str(random.randint(1, 9)) for _ in range(4)])
-        UserConfirmation.objects.create(
-            code=code,
-            user_id=self.id,
-            verification_type=verification_type
-        )
+        await get_code_store().acreate(self, verification_type, code)
 
         return code
 
     def check_username(self):
         if not self.username:
-            temp_username = f'instagram-{uuid.uuid4().__str__().split("-")[-1]}'
-            self.username = temp_username
-            while User.objects.filter(username=self.username).exists():
-                self.username = f'instagram-{uuid.uuid4().__str__().split("-")[-1]}'
+            self.username = generate_username()
 
     def check_pass(self):
         if not self.password:
@@ -85,31 +110,97 @@ class User(AbstractUser, BaseCreatedModel):
             # print(self.password)
 
     def hash_password(self):
-        if not self.password.startswith('pbkdf2_sha256'):
+        if self._password is not None:
+            return
+        try:
+            identify_hasher(self.password)
+        except ValueError:
             self.set_password(self.password)
-            # print(self.password)
 
     def check_email(self):
         if self.email:
             self.email = self.email.lower()
 
+    def check_phone(self):
+        from users.utility import normalize_phone
+
+        if self.phone:
+            self.phone = normalize_phone(self.phone)
+
     def token(self):
-        access = RefreshToken.for_user(self)
-        data = {
-            'access_token': str(access.access_token),
-            'refresh_token': str(access)
+        # Bitta so'rov ichida juftlik bir marta yaratiladi
+        if getattr(self, '_token', None) is None:
+            self._token = token_service.for_user(self)
+        return self._token
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(User, cls).from_db(db, field_names, values)
+        instance.remember_fields()
+        return instance
+
+    def tracked_value(self, field):
+        value = self.__dict__[field.attname]
+        if isinstance(field, models.FileField):
+            return getattr(value, 'name', value)
+        return value
+
+    def remember_fields(self):
+        self._loaded_values = {
+            field.attname: self.tracked_value(field)
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
         }
-        return data
 
-    def clean(self):
-        self.check_username()
-        self.check_pass()
-        self.check_email()
-        self.hash_password()
+    def changed_fields(self, update_fields=None):
+        # None - hamma maydonlar tekshiriladi (yangi obyekt yoki tarix yo'q)
+        if update_fields is not None:
+            return list(update_fields)
+        loaded = getattr(self, '_loaded_values', None)
+        if self._state.adding or loaded is None:
+            return None
+        return [
+            field.name for field in self._meta.concrete_fields
+            if field.attname in self.__dict__ and (
+                field.attname not in loaded or self.tracked_value(field) != loaded[field.attname]
+            )
+        ]
+
+    def clean(self, changed=None):
+        if changed is None or 'username' in changed:
+            self.check_username()
+        if changed is None or 'password' in changed:
+            self.check_pass()
+            self.hash_password()
+        if changed is None or 'email' in changed:
+            self.check_email()
+        if changed is None or 'phone' in changed:
+            self.check_phone()
 
     def save(self, *args, **kwargs):
-        self.clean()
-        super(User, self).save(*args, **kwargs)
+        changed = self.changed_fields(kwargs.get('update_fields'))
+        generated = (changed is None or 'username' in changed) and not self.username
+        self.clean(changed)
+        if changed is not None and kwargs.get('update_fields') is None:
+            # Hech narsa o'zgarmagan bo'lsa bo'sh ro'yxat saqlashni o'tkazib yuboradi
+            kwargs['update_fields'] = changed + ['updated_at'] if changed else []
+
+        if generated:
+            self.save_with_username(*args, **kwargs)
+        else:
+            super(User, self).save(*args, **kwargs)
+        self.remember_fields()
+
+    def save_with_username(self, *args, **kwargs):
+        for _ in range(3):
+            try:
+                with transaction.atomic():
+                    return super(User, self).save(*args, **kwargs)
+            except IntegrityError:
+                if not User.objects.filter(username=self.username).exists():
+                    raise
+                self.username = generate_username()
+        return super(User, self).save(*args, **kwargs)
 
 
 class UserConfirmation(BaseCreatedModel):
@@ -124,6 +215,12 @@ class UserConfirmation(BaseCreatedModel):
     is_confirmed = models.BooleanField(default=False)
     verification_type = models.CharField(max_length=255, choices=AUTH_STATUS)
 
+    class Meta:
+        indexes = [
+            # verify_codee va check_validation_code ikkalasi ham shu indeksdan foydalanadi
+            models.Index(fields=['user', 'is_confirmed', 'expire_time', 'code'], name='confirmation_lookup_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if self.verification_type == VIA_PHONE:
             self.expire_time = datetime.datetime.now() + datetime.timedelta(minutes=3)
@@ -137,7 +234,26 @@ class UserConfirmation(BaseCreatedModel):
         return f'{self.code}'
 
 
+class EmailOutbox(BaseCreatedModel):
+    STATUS = (
+        (PENDING, PENDING),
+        (SENT, SENT),
+        (FAILED, FAILED)
+    )
 
+    email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    status = models.CharField(max_length=255, choices=STATUS, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+        ]
 
-
+    def __str__(self):
+        return f'{self.email} {self.status}'
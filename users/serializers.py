@@ -1,13 +1,28 @@
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.exceptions import TokenBackendError, TokenError
+from rest_framework_simplejwt.settings import api_settings
 
+from users.blacklist import token_blacklist
+from users.images import AVATAR_UPLOAD_DIR, avatar_variant_names, store_by_hash
 from users.models import User, VIA_PHONE, VIA_EMAIL, VERIFICATION_CODE, DONE
-from users.utility import email_or_phone_number, send_email_cod
+from users.tokens import token_service
+from users.utility import normalize_contact, send_email_cod
 
 
 class UserSerializer(serializers.ModelSerializer):
+    EMAIL_EXISTS = {
+        'status': False,
+        'message': 'Bunday emaildan avval foydalanilgan'
+    }
+    PHONE_EXISTS = {
+        'status': False,
+        'message': 'Bunday telefon raqamdan foydalanilgan!'
+    }
+
     id = serializers.IntegerField(read_only=True)
     auth_stats = serializers.CharField(read_only=True, required=False)
     auth_type = serializers.CharField(read_only=True, required=False)
@@ -39,9 +54,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def auth_validate(attrs):
-        user_input = str(attrs.get('email_or_phone'))
-        input_user = email_or_phone_number(user_input)
-        # print(input_user, user_input)
+        input_user, user_input = normalize_contact(str(attrs.get('email_or_phone')))
         if input_user == 'phone':
             data = {
                 'phone': user_input,
@@ -62,20 +75,17 @@ class UserSerializer(serializers.ModelSerializer):
         return data
 
     def validate_email_or_phone(self, values):
-        values = values.lower()
-        if User.objects.filter(email=values).exists():
-            data = {
-                'status': False,
-                'message': 'Bunday emaildan avval foydalanilgan'
-            }
-            raise ValidationError(data)
+        kind, values = normalize_contact(values)
+        if User.objects.filter(**{kind: values}).exists():
+            raise ValidationError(self.EMAIL_EXISTS if kind == 'email' else self.PHONE_EXISTS)
 
-        elif User.objects.filter(phone=values).exists():
-            data = {
-                'status': False,
-                'message': 'Bunday telefon raqamdan foydalanilgan!'
-            }
-            raise ValidationError(data)
+        return values
+
+    @classmethod
+    async def avalidate_email_or_phone(cls, values):
+        kind, values = normalize_contact(values)
+        if await User.objects.filter(**{kind: values}).aexists():
+            raise ValidationError(cls.EMAIL_EXISTS if kind == 'email' else cls.PHONE_EXISTS)
 
         return values
 
@@ -141,7 +151,11 @@ class UserChangeSerializer(serializers.Serializer):
         instance.first_name = validated_data.get('first_name', instance.first_name)
         instance.last_name = validated_data.get('last_name', instance.last_name)
         instance.username = validated_data.get('username', instance.username)
-        instance.set_password(validated_data.get('password', instance.password))
+        if validated_data.get('password_hash'):
+            # async view parolni hashing_executor da oldindan xeshlagan
+            instance.password = validated_data['password_hash']
+        elif validated_data.get('password'):
+            instance.set_password(validated_data['password'])
         if instance.auth_type == VERIFICATION_CODE:
             instance.auth_type = DONE
         instance.save()
@@ -149,9 +163,45 @@ class UserChangeSerializer(serializers.Serializer):
 
 
 class UserPhotoSerializer(serializers.ModelSerializer):
+    avatar_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = User
-        fields = ['avatar']
+        fields = ['avatar', 'avatar_variants']
+
+    def to_representation(self, instance):
+        data = super(UserPhotoSerializer, self).to_representation(instance)
+        # Xom fayldagi EXIF process_avatars da olib tashlanadi, ungacha URL berilmaydi
+        if not instance.avatar_processed:
+            data['avatar'] = None
+        return data
+
+    def get_avatar_variants(self, instance):
+        if not instance.avatar_processed or not instance.avatar_hash:
+            return {}
+        return {
+            str(size): {fmt: default_storage.url(name) for fmt, name in names.items()}
+            for size, names in avatar_variant_names(instance.avatar_hash).items()
+        }
+
+    def save_avatar(self, instance, avatar):
+        # Fayl kontent xeshi bo'yicha saqlanadi, EXIF siz nusxa va o'lchamlarni process_avatars yasaydi
+        instance.avatar_hash, instance.avatar.name = store_by_hash(avatar, AVATAR_UPLOAD_DIR)
+        instance.avatar_processed = False
+
+    def create(self, validated_data):
+        avatar = validated_data.pop('avatar', None)
+        instance = User(**validated_data)
+        if avatar:
+            self.save_avatar(instance, avatar)
+        instance.save()
+        return instance
+
+    def update(self, instance, validated_data):
+        avatar = validated_data.pop('avatar', None)
+        if avatar:
+            self.save_avatar(instance, avatar)
+        return super(UserPhotoSerializer, self).update(instance, validated_data)
 
 
 class LoginSerializer(serializers.Serializer):
@@ -170,6 +220,24 @@ class LoginSerializer(serializers.Serializer):
         return attrs
 
 
+class RefreshSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=True, write_only=True)
 
+    def validate(self, attrs):
+        try:
+            payload = token_service.decode(attrs['refresh'], 'refresh')
+        except (TokenError, TokenBackendError):
+            data = {
+                'status': 'Fail',
+                'message': "Token yaroqsiz yoki muddati o'tgan"
+            }
+            raise ValidationError(data)
+        if token_blacklist.is_blacklisted(payload[api_settings.JTI_CLAIM]):
+            data = {
+                'status': 'Fail',
+                'message': 'Token bekor qilingan'
+            }
+            raise ValidationError(data)
 
-
+        attrs['payload'] = payload
+        return attrs
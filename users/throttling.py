@@ -0,0 +1,177 @@
+import hashlib
+import time
+from collections.abc import Mapping
+
+from django.core.cache import cache
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from users.utility import normalize_contact
+
+# Sirpanuvchi oyna (sliding window counter): joriy va oldingi oyna hisoblagichlari
+# cache'da turadi, so'rovlar soni prev * (oynaning qolgan ulushi) + curr deb baholanadi.
+# Har bir so'rovga add/incr va bitta get (rad etilsa yana decr) - barchasi O(1).
+# DRF throttle'lari autentifikatsiyadan keyin, serializer va parol xeshlashdan oldin ishlaydi.
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    scope = None
+    key_prefix = 'throttle'
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    @staticmethod
+    def parse_rate(rate):
+        num, period = rate.split('/')
+        return int(num), DURATIONS[period[0]]
+
+    def get_ident_key(self, request, view):
+        raise NotImplementedError
+
+    def window(self, request, view):
+        # (chegara, davomiylik, oynada o'tgan vaqt, joriy va oldingi oyna kalitlari) yoki None
+        rate = self.get_rate()
+        if rate is None:
+            return None
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return None
+
+        num, duration = self.parse_rate(rate)
+        window, elapsed = divmod(time.time(), duration)
+        window = int(window)
+        base = f'{self.key_prefix}:{self.scope}:{ident}'
+        return num, duration, elapsed, f'{base}:{window}', f'{base}:{window - 1}'
+
+    def allow_request(self, request, view):
+        window = self.window(request, view)
+        if window is None:
+            return True
+        num, duration, elapsed, current_key, previous_key = window
+
+        # Avval oshiriladi, keyin qaytgan qiymat tekshiriladi: parallel so'rovlardan
+        # aynan chegaragacha bo'lganlari o'tadi
+        current = self.increment(current_key, duration * 2)
+        previous = (cache.get(previous_key) or 0) * (1 - elapsed / duration)
+        if previous + current > num:
+            # Rad etilgan so'rov hisobga qo'shilmaydi
+            try:
+                cache.decr(current_key)
+            except ValueError:
+                pass
+            self.wait_seconds = duration - elapsed
+            return False
+        return True
+
+    async def aallow_request(self, request, view):
+        # async view'lar uchun: cache amallari event loop'ni to'smaydi
+        window = self.window(request, view)
+        if window is None:
+            return True
+        num, duration, elapsed, current_key, previous_key = window
+
+        current = await self.aincrement(current_key, duration * 2)
+        previous = (await cache.aget(previous_key) or 0) * (1 - elapsed / duration)
+        if previous + current > num:
+            try:
+                await cache.adecr(current_key)
+            except ValueError:
+                pass
+            self.wait_seconds = duration - elapsed
+            return False
+        return True
+
+    @staticmethod
+    def increment(key, timeout):
+        if cache.add(key, 1, timeout):
+            return 1
+        try:
+            return cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout)
+            return 1
+
+    @staticmethod
+    async def aincrement(key, timeout):
+        if await cache.aadd(key, 1, timeout):
+            return 1
+        try:
+            return await cache.aincr(key)
+        except ValueError:
+            await cache.aset(key, 1, timeout)
+            return 1
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+
+class IPThrottle(SlidingWindowThrottle):
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class UserThrottle(SlidingWindowThrottle):
+
+    def get_ident_key(self, request, view):
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return self.get_ident(request)
+        return user.pk
+
+
+class ContactThrottle(SlidingWindowThrottle):
+    # Bitta login (username/email/telefon) ga turli IP lardan keladigan urinishlar.
+    # Email va telefon ContactBackend dagidek normallashtiriladi: +998 90 123-45-67 va
+    # 998901234567 bitta kalit
+    field = 'username'
+
+    def get_ident_key(self, request, view):
+        data = request.data
+        if not isinstance(data, Mapping):
+            return None
+        value = data.get(self.field)
+        if not value:
+            return None
+        value = str(value).strip()
+        try:
+            value = normalize_contact(value)[1]
+        except ValidationError:
+            value = value.lower()
+        return hashlib.sha1(value.encode()).hexdigest()
+
+
+class GlobalThrottle(SlidingWindowThrottle):
+    # Butun klaster uchun umumiy chegara: PBKDF2 ishini yuklama oshganda kesadi
+
+    def get_ident_key(self, request, view):
+        return 'all'
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginContactThrottle(ContactThrottle):
+    scope = 'login_contact'
+
+
+class LoginGlobalThrottle(GlobalThrottle):
+    scope = 'login'
+
+
+class NewCodeThrottle(UserThrottle):
+    scope = 'new_code'
+
+
+class ConfirmationThrottle(UserThrottle):
+    scope = 'confirmation'
+
+
+# Tartib muhim: login view'lari birinchi rad etgan throttle'da to'xtaydi, shuning uchun umumiy
+# chegara faqat IP va login chegaralaridan o'tgan so'rovlarni sanaydi - bitta mijoz uni
+# to'ldirib hammani bloklay olmaydi
+LOGIN_THROTTLES = [LoginIPThrottle, LoginContactThrottle, LoginGlobalThrottle]
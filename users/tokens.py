@@ -0,0 +1,82 @@
+from uuid import uuid4
+
+from django.conf import settings
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.state import token_backend
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_to_epoch, datetime_from_epoch, get_md5_hash_password
+
+
+class TokenService:
+    # RefreshToken.for_user + str() har safar sozlamalarni qayta o'qiydi va refresh tokenni
+    # ikki marta imzolaydi. Bu yerda o'zgarmas qismlar bir marta tayyorlanadi.
+
+    def __init__(self):
+        self.backend = token_backend
+        self.user_id_field = api_settings.USER_ID_FIELD
+        self.user_id_claim = api_settings.USER_ID_CLAIM
+        self.type_claim = api_settings.TOKEN_TYPE_CLAIM
+        self.jti_claim = api_settings.JTI_CLAIM
+        self.access_lifetime = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+        self.refresh_lifetime = int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+        self.check_revoke = getattr(api_settings, 'CHECK_REVOKE_TOKEN', False)
+        self.track_outstanding = 'rest_framework_simplejwt.token_blacklist' in settings.INSTALLED_APPS
+
+    def claims(self, user):
+        user_id = getattr(user, self.user_id_field)
+        if not isinstance(user_id, int):
+            user_id = str(user_id)
+        data = {self.user_id_claim: user_id}
+        if self.check_revoke:
+            data[api_settings.REVOKE_TOKEN_CLAIM] = get_md5_hash_password(user.password)
+        return data
+
+    def for_user(self, user):
+        now = aware_utcnow()
+        iat = datetime_to_epoch(now)
+        claims = self.claims(user)
+
+        refresh = {
+            self.type_claim: 'refresh',
+            'exp': iat + self.refresh_lifetime,
+            'iat': iat,
+            self.jti_claim: uuid4().hex,
+            **claims
+        }
+        refresh_token = self.backend.encode(refresh)
+        access_token = self.access(user, iat, claims)
+
+        if self.track_outstanding:
+            OutstandingToken.objects.create(
+                user=user,
+                jti=refresh[self.jti_claim],
+                token=refresh_token,
+                created_at=now,
+                expires_at=datetime_from_epoch(refresh['exp'])
+            )
+
+        return {
+            'access_token': access_token,
+            'refresh_token': refresh_token
+        }
+
+    def access(self, user, iat=None, claims=None):
+        iat = iat or datetime_to_epoch(aware_utcnow())
+        return self.backend.encode({
+            self.type_claim: 'access',
+            'exp': iat + self.access_lifetime,
+            'iat': iat,
+            self.jti_claim: uuid4().hex,
+            **(claims or self.claims(user))
+        })
+
+    def decode(self, raw_token, token_type):
+        # Imzo va exp tekshiriladi; TokenBackendError yoki TokenError ko'tariladi
+        payload = self.backend.decode(raw_token, verify=True)
+        if payload.get(self.type_claim) != token_type or self.jti_claim not in payload:
+            raise TokenError('Token type is wrong')
+        return payload
+
+
+token_service = TokenService()
@@ -1,5 +1,11 @@
 from django.urls import path
-from users.views import UserSignUpView, UserConfirmationView, NewCode, UserChangeView, UserPhoneView, UserLoginAPIView
+from users.async_views import (
+    AsyncUserSignUpView, AsyncUserConfirmationView, AsyncNewCodeView, AsyncUserLoginView, AsyncUserChangeView
+)
+from users.views import (
+    UserSignUpView, UserConfirmationView, NewCode, UserChangeView, UserPhoneView, UserLoginAPIView, UserAvatarView,
+    TokenRefreshView, LogoutView
+)
 
 
 urlpatterns = [
@@ -8,4 +14,12 @@ urlpatterns = [
     path('code/', UserConfirmationView.as_view(), name='code'),
     path('new_code/', NewCode.as_view(), name='new_code'),
     path('user_change/', UserChangeView.as_view(), name='user_change'),
+    path('user_avatar/', UserAvatarView.as_view(), name='user_avatar'),
+    path('token-refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path('logout/', LogoutView.as_view(), name='logout'),
+    path('async/user/', AsyncUserSignUpView.as_view(), name='async-user-create'),
+    path('async/code/', AsyncUserConfirmationView.as_view(), name='async-code'),
+    path('async/new_code/', AsyncNewCodeView.as_view(), name='async-new_code'),
+    path('async/user-login/', AsyncUserLoginView.as_view(), name='async-user-login'),
+    path('async/user_change/', AsyncUserChangeView.as_view(), name='async-user_change'),
 ]
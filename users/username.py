@@ -0,0 +1,57 @@
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+
+ALPHABET = '0123456789abcdefghijklmnopqrstuvwxyz'
+EPOCH_MS = 1704067200000  # 2024-01-01 UTC
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+
+
+def base36(number):
+    result = ''
+    while True:
+        number, rest = divmod(number, 36)
+        result = ALPHABET[rest] + result
+        if not number:
+            return result
+
+
+class UsernameGenerator:
+    # vaqt (ms) + node id + ketma-ketlik: bitta node ichida takrorlanmaydi,
+    # shuning uchun bazaga `exists()` so'rovi kerak emas. Node id lar ustma-ust
+    # tushib qolgan kamdan-kam holatni User.save dagi IntegrityError ushlaydi.
+
+    def __init__(self, node_id=None):
+        if node_id is None:
+            node_id = getattr(settings, 'USERNAME_NODE_ID', None)
+        if node_id is None:
+            node_id = (os.getpid() ^ random.getrandbits(NODE_BITS)) & ((1 << NODE_BITS) - 1)
+        self.node_id = node_id & ((1 << NODE_BITS) - 1)
+        self.sequence = 0
+        self.last_ms = -1
+        self.lock = threading.Lock()
+
+    def next_id(self):
+        with self.lock:
+            now = int(time.time() * 1000)
+            if now < self.last_ms:
+                now = self.last_ms
+            if now == self.last_ms:
+                self.sequence = (self.sequence + 1) & ((1 << SEQUENCE_BITS) - 1)
+                if self.sequence == 0:
+                    while now <= self.last_ms:
+                        now = int(time.time() * 1000)
+            else:
+                self.sequence = 0
+            self.last_ms = now
+            return ((now - EPOCH_MS) << (NODE_BITS + SEQUENCE_BITS)) | (self.node_id << SEQUENCE_BITS) | self.sequence
+
+    def __call__(self):
+        return f'instagram-{base36(self.next_id())}'
+
+
+generate_username = UsernameGenerator()
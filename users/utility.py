@@ -1,29 +1,44 @@
 import re
-from django.conf import settings
 
-from django.core.mail import send_mail
 from rest_framework.exceptions import ValidationError
 
+from users.models import EmailOutbox
+
 email_regex = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,7}\b")
 phone_regex = re.compile(r"(\+[0-9]+\s*)?(\([0-9]+\))?[\s0-9\-]+[0-9]+")
+not_digit_regex = re.compile(r"\D")
 
 
-def email_or_phone_number(email_or_phone_number: str):
-    if re.fullmatch(email_regex, email_or_phone_number):
-        data = 'email'
-    elif re.fullmatch(phone_regex, email_or_phone_number):
-        data = 'phone'
-    else:
-        raise ValidationError("Invalid Email or Phone Number")
-    return data
+def normalize_phone(phone: str):
+    # +998 90 123-45-67 -> 998901234567
+    return not_digit_regex.sub('', phone)
+
 
-# print(email_or_phone_number('burxon@gmail.com'))
+def normalize_contact(email_or_phone_number: str):
+    value = email_or_phone_number.strip()
+    if email_regex.fullmatch(value):
+        return 'email', value.lower()
+    if phone_regex.fullmatch(value):
+        return 'phone', normalize_phone(value)
+    raise ValidationError("Invalid Email or Phone Number")
+
+
+def email_or_phone_number(email_or_phone_number: str):
+    return normalize_contact(email_or_phone_number)[0]
 
 
 def send_email_cod(email, code):
-    send_mail(
+    # Xat navbatga qo'yiladi, uni `manage.py send_emails` yuboradi
+    EmailOutbox.objects.create(
+        email=email,
+        subject="Tasdiq kodi",
+        message=f"Your code: {code}"
+    )
+
+
+async def asend_email_cod(email, code):
+    await EmailOutbox.objects.acreate(
+        email=email,
         subject="Tasdiq kodi",
-        message=f"Your code: {code}",
-        from_email=settings.EMAIL_HOST_USER,
-        recipient_list=[email]
-    )
\ No newline at end of file
+        message=f"Your code: {code}"
+    )
@@ -1,5 +1,3 @@
-from datetime import datetime
-
 from django.shortcuts import render
 from drf_spectacular.utils import extend_schema
 from rest_framework import status, permissions
@@ -8,9 +6,17 @@ from rest_framework.generics import CreateAPIView, UpdateAPIView, get_object_or_
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
+from users.authentication import user_cache
+from users.blacklist import token_blacklist
+from users.code_store import get_code_store
 from users.models import User, NEW, VERIFICATION_CODE, UserConfirmation, VIA_EMAIL, VIA_PHONE
-from users.serializers import UserSerializer, ConfSerializer, UserChangeSerializer, UserPhotoSerializer, LoginSerializer
+from users.serializers import (
+    UserSerializer, ConfSerializer, UserChangeSerializer, UserPhotoSerializer, LoginSerializer, RefreshSerializer
+)
+from users.throttling import LOGIN_THROTTLES, ConfirmationThrottle, NewCodeThrottle
+from users.tokens import token_service
 from users.utility import send_email_cod
 
 
@@ -21,6 +27,7 @@ class UserSignUpView(CreateAPIView):
 
 class UserConfirmationView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [ConfirmationThrottle]
 
     @extend_schema(
         request=ConfSerializer
@@ -30,11 +37,12 @@ class UserConfirmationView(APIView):
         serializer = ConfSerializer(data=request.data)
         if serializer.is_valid():
             self.verify_codee(user, serializer.validated_data.get("code"))
+            token = user.token()
             data = {
                 'status': 'Success',
                 'message': f'Confirmation code {serializer.validated_data["code"]}',
-                'access_token': user.token()['access_token'],
-                'refresh_token': user.token()['refresh_token']
+                'access_token': token['access_token'],
+                'refresh_token': token['refresh_token']
             }
         else:
             data = {
@@ -45,19 +53,12 @@ class UserConfirmationView(APIView):
 
     @staticmethod
     def verify_codee(user, code):
-        verification = user.code.filter(
-            code=code,
-            is_confirmed=False,
-            expire_time__gte=datetime.now()
-        )
-        if not verification.exists():
+        if not get_code_store().verify(user, code):
             data = {
                 'status': 'Fail',
                 'message': 'Code xato yokida eskirgan'
             }
             raise ValidationError(data)
-        # print(verification)
-        verification.update(is_confirmed=True)
         if user.auth_stats == NEW:
             user.auth_stats = VERIFICATION_CODE
             user.save()
@@ -66,6 +67,7 @@ class UserConfirmationView(APIView):
 
 class NewCode(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [NewCodeThrottle]
 
     def get(self, request, *args, **kwargs):
         user = request.user
@@ -90,11 +92,7 @@ class NewCode(APIView):
 
     @staticmethod
     def check_validation_code(user):
-        verification = user.code.filter(
-            is_confirmed=False,
-            expire_time__gte=datetime.now()
-        )
-        if verification:
+        if get_code_store().has_pending(user):
             data = {
                 'message': 'Code xali yaroqli'
             }
@@ -121,6 +119,66 @@ class UserChangeView(UpdateAPIView):
         return Response(data)
 
 
+class UserAvatarView(UpdateAPIView):
+    serializer_class = UserPhotoSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    http_method_names = ['patch', 'put']
+
+    def get_object(self):
+        return get_object_or_404(User, id=self.request.user.id)
+
+
+class TokenRefreshView(APIView):
+    # Refresh token rotatsiyasi: eski token qora ro'yxatga tushadi va yangi juftlik beriladi
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(
+        request=RefreshSerializer
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = RefreshSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        payload = serializer.validated_data['payload']
+        try:
+            user = user_cache.get(payload[jwt_settings.USER_ID_CLAIM])
+        except (KeyError, User.DoesNotExist):
+            user = None
+        if user is None or not user.is_active:
+            raise ValidationError({'status': 'Fail', 'message': 'Foydalanuvchi topilmadi'})
+
+        if not jwt_settings.ROTATE_REFRESH_TOKENS:
+            return Response({'access_token': token_service.access(user)})
+        if jwt_settings.BLACKLIST_AFTER_ROTATION:
+            # Bitta refresh token bilan parallel so'rovlardan faqat bittasi yangi juftlik oladi
+            if not token_blacklist.blacklist(payload, serializer.validated_data['refresh'], user.id):
+                raise ValidationError({'status': 'Fail', 'message': 'Token bekor qilingan'})
+        token = token_service.for_user(user)
+        return Response({
+            'access_token': token['access_token'],
+            'refresh_token': token['refresh_token']
+        })
+
+
+class LogoutView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        request=RefreshSerializer
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = RefreshSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        payload = serializer.validated_data['payload']
+        if payload.get(jwt_settings.USER_ID_CLAIM) != request.user.id:
+            raise ValidationError({'status': 'Fail', 'message': 'Token boshqa foydalanuvchiga tegishli'})
+
+        token_blacklist.blacklist(payload, serializer.validated_data['refresh'], request.user.id)
+        return Response({
+            'status': 'Success',
+            'message': 'Tizimdan chiqildi'
+        })
+
+
 class UserPhoneView(ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserPhotoSerializer
@@ -129,6 +187,13 @@ class UserPhoneView(ModelViewSet):
 
 class UserLoginAPIView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = LOGIN_THROTTLES
+
+    def check_throttles(self, request):
+        # DRF hamma throttle'ni hisoblaydi; bu yerda birinchi raddan keyin keyingilari sanalmaydi
+        for throttle in self.get_throttles():
+            if not throttle.allow_request(request, self):
+                self.throttled(request, throttle.wait())
 
     @extend_schema(
         request=LoginSerializer
@@ -137,10 +202,11 @@ class UserLoginAPIView(APIView):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data['user']
+            token = user.token()
 
             return Response({
-                'access_token': user.token()['access_token'],
-                'refresh_token': user.token()['refresh_token']
+                'access_token': token['access_token'],
+                'refresh_token': token['refresh_token']
             }, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)